@@ -7,6 +7,8 @@ import time
 from datetime import datetime
 from typing import Any, Dict, Optional, Union
 
+from state_manager import json_loads
+
 DEBUG_LOG_PATH = "/Users/ricrom/Code/luigi/.cursor/debug.log"
 
 def _now_ms() -> int:
@@ -98,7 +100,7 @@ def _run_print_stream_json(
                 if not candidate:
                     continue
                 try:
-                    obj = json.loads(candidate)
+                    obj = json_loads(candidate)
                 except Exception:
                     continue
                 if isinstance(obj, dict):
@@ -277,7 +279,7 @@ class ClaudeCodeClient:
         try:
             # With stream-json, we already parsed line-by-line and stored the last JSON object
             # in `result.stdout` (as a JSON string) for back-compat with existing callers.
-            output = json.loads(result.stdout.strip() or "{}")
+            output = json_loads(result.stdout.strip() or "{}")
             return output if isinstance(output, dict) else None
         except json.JSONDecodeError:
             print("Error parsing Claude Code JSON output.")
@@ -421,7 +423,7 @@ class ClaudeCodeClient:
             return None
 
         try:
-            payload = json.loads(result.stdout.strip() or "{}")
+            payload = json_loads(result.stdout.strip() or "{}")
         except json.JSONDecodeError:
             return None
 
@@ -12,6 +12,13 @@ import tempfile
 from datetime import datetime
 from typing import Any, Dict, Optional
 
+from state_manager import json_loads
+
+# Shared by every prompt that may return NEEDS_USER_INPUT, so agents ask all their questions in one round.
+BATCH_QUESTIONS_INSTRUCTION = (
+    "List every clarification you anticipate in that one response; do not re-ask answered questions."
+)
+
 
 def _schemas_dir() -> str:
     return os.path.join(os.path.dirname(__file__), "schemas")
@@ -331,7 +338,7 @@ class CodexClient:
             if not content:
                 raise RuntimeError("Codex produced an empty final message.")
 
-            return json.loads(content)
+            return json_loads(content)
         finally:
             try:
                 os.remove(out_path)
@@ -356,6 +363,7 @@ class CodexClient:
             "- Use null or empty arrays for fields that do not apply.\n"
             "- If you require clarification from the user, do NOT guess. Output JSON with:\n"
             '  {"status":"NEEDS_USER_INPUT","questions":["..."]}\n'
+            f"  {BATCH_QUESTIONS_INSTRUCTION}\n"
             "- Output MUST be valid JSON matching the provided schema.\n\n"
             f"User task:\n{task}\n"
             + (f"\nUser context / answers:\n{user_context}\n" if user_context else "")
@@ -372,6 +380,7 @@ class CodexClient:
             "- Use null or empty arrays for fields that do not apply.\n"
             "- If you require clarification from the user, do NOT guess. Output JSON with:\n"
             '  {"status":"NEEDS_USER_INPUT","questions":["..."]}\n'
+            f"  {BATCH_QUESTIONS_INSTRUCTION}\n"
             "Output MUST be valid JSON matching the provided schema.\n\n"
             f"Existing plan JSON:\n{json.dumps(plan, indent=2)}\n\n"
             f"Reviewer JSON:\n{json.dumps(review, indent=2)}\n"
@@ -397,12 +406,13 @@ class CodexClient:
             "- Use null or empty arrays for fields that do not apply.\n"
             "- If you require clarification from the user, do NOT guess. Output JSON with:\n"
             '  {"status":"NEEDS_USER_INPUT","questions":["..."]}\n'
+            f"  {BATCH_QUESTIONS_INSTRUCTION}\n"
             "Output MUST be valid JSON matching the provided schema.\n\n"
             f"Plan JSON:\n{json.dumps(plan, indent=2)}\n\n"
             f"Claude Code result summary:\n{implementation_result}\n\n"
             f"Test results JSON:\n{json.dumps(test_results or {}, indent=2)}\n\n"
-            + (f"User context / answers:\n{user_context}\n\n" if user_context else "")
-            + f"Code diff:\n{diff}\n"
+            f"Code diff:\n{diff}\n"
+            + (f"\nUser context / answers:\n{user_context}\n" if user_context else "")
         )
 
     @staticmethod
@@ -415,10 +425,11 @@ class CodexClient:
             "- Use null or empty arrays for fields that do not apply.\n"
             "If you need clarification from the user to answer, do NOT guess. Output JSON with:\n"
             '  {"status":"NEEDS_USER_INPUT","questions":["..."]}\n'
+            f"  {BATCH_QUESTIONS_INSTRUCTION}\n"
             "Otherwise output JSON with:\n"
             '  {"status":"ANSWER","answer":"..."}\n'
             "Output MUST be valid JSON matching the provided schema.\n\n"
-            f"Executor questions:\n{json.dumps(questions, indent=2)}\n\n"
             f"Context JSON:\n{json.dumps(context, indent=2)}\n\n"
+            f"Executor questions:\n{json.dumps(questions, indent=2)}\n\n"
             + (f"User context / answers:\n{user_context}\n" if user_context else "")
         )
@@ -0,0 +1,115 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from typing import Optional
+
+# inotify(7) constants (Linux).
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_EVENT_HEADER = struct.Struct("iIII")
+
+# Polling fallback: start fast so quick answers are seen promptly, then back off so long waits
+# wake rarely. Waits settle at max(poll_interval_sec, _MAX_POLL_BACKOFF_SEC).
+_MIN_POLL_SEC = 0.05
+_POLL_BACKOFF_FACTOR = 1.5
+_MAX_POLL_BACKOFF_SEC = 2.0
+
+_libc = None
+
+
+def _inotify_libc():
+    """Return libc with inotify symbols, or None when unavailable (non-Linux, no libc)."""
+    global _libc
+    if _libc is not None:
+        return _libc or None
+    _libc = False
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    except (OSError, AttributeError):
+        return None
+    _libc = libc
+    return libc
+
+
+def _poll_for_file(
+    path: str, timeout_sec: Optional[float], poll_interval_sec: float, cancel_fd: Optional[int]
+) -> bool:
+    deadline = None if timeout_sec is None else time.monotonic() + timeout_sec
+    max_delay = max(poll_interval_sec, _MAX_POLL_BACKOFF_SEC)
+    next_delay = min(_MIN_POLL_SEC, poll_interval_sec)
+    while not os.path.exists(path):
+        delay = next_delay
+        next_delay = min(next_delay * _POLL_BACKOFF_FACTOR, max_delay)
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            delay = min(delay, remaining)
+        if cancel_fd is None:
+            time.sleep(delay)
+        elif select.select([cancel_fd], [], [], delay)[0]:
+            return os.path.exists(path)
+    return True
+
+
+def wait_for_file(
+    path: str,
+    timeout_sec: Optional[float],
+    *,
+    poll_interval_sec: float = 0.5,
+    cancel_fd: Optional[int] = None,
+) -> bool:
+    """Block until `path` exists or `timeout_sec` elapses; returns whether it exists.
+
+    On Linux this sleeps on an inotify watch of the parent directory, so writers that finish
+    with close() or an atomic rename wake the caller immediately. Elsewhere (or if inotify
+    cannot be set up) it falls back to polling with exponential backoff, starting at 50 ms and
+    capped at the larger of `poll_interval_sec` and 2 seconds. If `cancel_fd`
+    becomes readable (e.g. the read end of a pipe another thread writes to), the wait ends early.
+    """
+    if os.path.exists(path):
+        return True
+    libc = _inotify_libc()
+    if libc is None:
+        return _poll_for_file(path, timeout_sec, poll_interval_sec, cancel_fd)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    name = os.fsencode(os.path.basename(path))
+    fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    if fd < 0:
+        return _poll_for_file(path, timeout_sec, poll_interval_sec, cancel_fd)
+    try:
+        if libc.inotify_add_watch(fd, os.fsencode(directory), _IN_CLOSE_WRITE | _IN_MOVED_TO) < 0:
+            return _poll_for_file(path, timeout_sec, poll_interval_sec, cancel_fd)
+        # The file may have landed between the first check and the watch being armed.
+        if os.path.exists(path):
+            return True
+        deadline = None if timeout_sec is None else time.monotonic() + timeout_sec
+        while True:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            watched = [fd] if cancel_fd is None else [fd, cancel_fd]
+            ready, _, _ = select.select(watched, [], [], remaining)
+            if not ready or cancel_fd in ready:
+                return os.path.exists(path)
+            try:
+                data = os.read(fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            offset = 0
+            while offset + _IN_EVENT_HEADER.size <= len(data):
+                _, _, _, name_len = _IN_EVENT_HEADER.unpack_from(data, offset)
+                offset += _IN_EVENT_HEADER.size
+                event_name = data[offset : offset + name_len].rstrip(b"\0")
+                offset += name_len
+                if event_name == name:
+                    return True
+    finally:
+        os.close(fd)
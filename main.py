@@ -1,34 +1,51 @@
 
 import argparse
+import contextlib
+import functools
+import hashlib
 import json
 import os
+import re
+import stat
 import subprocess
 import sys
 import threading
 import time
 import uuid
+from collections import ChainMap
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional
+from typing import TYPE_CHECKING, AbstractSet, Any, Callable, Dict, List, Optional
 
 from agents import AgentSpec, assignment_config, normalize_agents
-from telegram_client import TelegramClient
-from codex_client import CodexClient
+from codex_client import BATCH_QUESTIONS_INSTRUCTION, CodexClient
 from claude_code_client import ClaudeCodeClient
-from state_manager import StateManager
+from file_watch import wait_for_file
+from state_manager import StateManager, json_loads
 from workspace_manager import WorkspaceManager, Workspace
 from test_runner import run_tests
 from ui_server import compute_project_id, start_streamlit_ui
 
+if TYPE_CHECKING:
+    # Imported lazily in main(): urllib.request is only needed when Telegram is enabled.
+    from telegram_client import TelegramClient
+
 
 def load_config(path: str):
     """Load configuration from JSON or YAML.
 
-    YAML requires PyYAML; JSON uses only the standard library.
+    YAML requires PyYAML; JSON uses only the standard library. A YAML-named file whose content
+    is a JSON object is parsed as JSON, so PyYAML is only imported for actual YAML syntax.
     """
+    with open(path, "rb") as f:
+        data = f.read()
     if path.endswith(".json"):
-        with open(path, "r") as f:
-            return json.load(f)
+        return json_loads(data)
+    if data.lstrip()[:1] == b"{":
+        try:
+            return json_loads(data)
+        except ValueError:
+            pass  # YAML flow mapping (e.g. `{a: 1}`), not JSON
 
     # Default: YAML
     try:
@@ -40,8 +57,7 @@ def load_config(path: str):
             "Or provide a JSON config via: --config config.json"
         ) from e
 
-    with open(path, "r") as f:
-        return yaml.safe_load(f)
+    return yaml.safe_load(data)
 
 
 def _normalize_path(path: str, *, repo_path: str) -> str:
@@ -51,6 +67,11 @@ def _normalize_path(path: str, *, repo_path: str) -> str:
     return os.path.abspath(os.path.join(repo_path, expanded))
 
 
+def _dict_or_none(value: Any) -> Optional[dict]:
+    """Return `value` if it is a dict (e.g. a section of state.json), else None."""
+    return value if isinstance(value, dict) else None
+
+
 def _optional_positive_int(value: Any, *, default: Optional[int]) -> Optional[int]:
     """Return a positive int or None (meaning unlimited).
 
@@ -60,6 +81,8 @@ def _optional_positive_int(value: Any, *, default: Optional[int]) -> Optional[in
     """
     if value is None:
         return None
+    if type(value) is int:  # common case (YAML/JSON ints); bool is excluded by the exact type check
+        return value if value > 0 else None
     if isinstance(value, bool):
         return default
     try:
@@ -73,19 +96,42 @@ def _optional_positive_int(value: Any, *, default: Optional[int]) -> Optional[in
 
 def _read_json_file(path: str) -> dict | None:
     try:
-        with open(path, "r") as f:
-            return json.load(f)
-    except FileNotFoundError:
+        with open(path, "rb") as f:
+            return json_loads(f.read())
+    except (FileNotFoundError, NotADirectoryError):
         return None
-    except json.JSONDecodeError:
+    except ValueError:
         bak_path = f"{path}.bak"
         try:
-            with open(bak_path, "r") as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
+            with open(bak_path, "rb") as f:
+                return json_loads(f.read())
+        except (FileNotFoundError, ValueError):
             return None
 
 
+_RUNNING_STATUS_RE = re.compile(rb'"run_status"\s*:\s*"running"')
+
+
+def _read_running_state(state_path: str) -> dict | None:
+    """Parse state.json only if it may have run_status == "running"; otherwise return None.
+
+    Finished runs can carry large plans/diffs; a byte search over the one read lets the resume
+    scan skip them without building the whole object. Undecodable files go through
+    `_read_json_file`, which falls back to state.json.bak.
+    """
+    try:
+        with open(state_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if _RUNNING_STATUS_RE.search(data) is None:
+        return None
+    try:
+        return json_loads(data)
+    except ValueError:
+        return _read_json_file(state_path)
+
+
 def _load_schema(path: str) -> dict:
     with open(path, "r") as f:
         return json.load(f)
@@ -180,7 +226,7 @@ def _parse_task_message(text: str) -> Dict[str, Any]:
 def _send_telegram_message(
     *,
     state_manager: StateManager,
-    telegram: Optional[TelegramClient],
+    telegram: Optional["TelegramClient"],
     text: str,
     label: str,
 ) -> bool:
@@ -196,6 +242,40 @@ def _send_telegram_message(
     return ok
 
 
+_TELEGRAM_MAX_MESSAGE_CHARS = 4096
+
+
+def _pack_telegram_sections(
+    sections: List[str],
+    *,
+    separator: str = "\n\n---\n\n",
+    limit: int = _TELEGRAM_MAX_MESSAGE_CHARS,
+) -> List[str]:
+    """Join sections into as few messages as fit Telegram's size limit.
+
+    Sections are kept whole where possible; a single oversized section is hard-split.
+    """
+    messages: List[str] = []
+    current = ""
+    for section in sections:
+        while len(section) > limit:
+            if current:
+                messages.append(current)
+                current = ""
+            messages.append(section[:limit])
+            section = section[limit:]
+        if not current:
+            current = section
+        elif len(current) + len(separator) + len(section) <= limit:
+            current = f"{current}{separator}{section}"
+        else:
+            messages.append(current)
+            current = section
+    if current:
+        messages.append(current)
+    return messages
+
+
 def _claude_plan_prompt(task: str, *, user_context: str) -> str:
     return (
         "PHASE: PLAN\n"
@@ -226,6 +306,7 @@ def _review_candidates_prompt(
         "Output JSON matching the reviewer_decision schema:\n"
         "- Always include: status, winner_candidate_id, summary, feedback, next_prompt, questions, notes.\n"
         '- If you need clarification from the admin, set status to "NEEDS_USER_INPUT" and add questions.\n'
+        f"  {BATCH_QUESTIONS_INSTRUCTION}\n"
         "- Otherwise use status APPROVED or REJECTED.\n"
         "CRITICAL semantics:\n"
         '- status="APPROVED" means Luigi will STOP iterating and persist/commit the selected candidate.\n'
@@ -278,12 +359,164 @@ def _validate_reviewer_plan(plan: Dict[str, Any]) -> Dict[str, Any]:
     return plan
 
 
+# Floor between Telegram getUpdates calls made by one watcher.
+_TELEGRAM_MIN_POLL_GAP_SEC = 1.0
+
+
+def _poll_for_response(
+    response_path: str,
+    *,
+    state_manager: StateManager,
+    telegram: Optional["TelegramClient"],
+    match_telegram: Optional[Callable[[str], Any]],
+    poll_interval_sec: float,
+    timeout_sec: Optional[float],
+    timeout_message: str,
+) -> tuple[str, Any]:
+    """Wait for a UI response file or a matching Telegram message.
+
+    Returns ("ui", payload dict) or ("telegram", whatever `match_telegram` returned for the
+    first message it accepted). Raises RuntimeError(timeout_message) once `timeout_sec` passes.
+    """
+    poll_telegram = telegram is not None and match_telegram is not None
+    start = time.time()
+    # With Telegram enabled, helper threads long-poll Telegram and watch for the UI file, and
+    # both notify `response_cv`, so whichever answer arrives first wakes this thread at once.
+    # `stop_watchers` is set under `response_cv` as soon as this thread settles on a result, and
+    # the Telegram watcher only commits (offset and hit) under it, so no answer is acknowledged
+    # after the wait is over.
+    response_cv = threading.Condition()
+    telegram_hits: list = []
+    stop_watchers = threading.Event()
+
+    def _watch_telegram() -> None:
+        offset = state_manager.get_state("telegram_update_offset")
+        if not isinstance(offset, int):
+            offset = None
+        while not stop_watchers.is_set():
+            polled_at = time.monotonic()
+            updates = telegram.poll_updates(offset)
+            matched = None
+            for message in telegram.filter_messages(updates):
+                text = str(message.get("text", "")).strip()
+                if text:
+                    matched = match_telegram(text)
+                    if matched is not None:
+                        break
+            next_offset = _next_telegram_offset(updates, offset)
+            with response_cv:
+                if stop_watchers.is_set():
+                    # Leave the stored offset alone so the next prompt sees these updates again.
+                    return
+                if next_offset != offset:
+                    # One state write per poll, not per update.
+                    offset = next_offset
+                    state_manager.update_state("telegram_update_offset", offset)
+                if matched is not None:
+                    telegram_hits.append(matched)
+                    response_cv.notify_all()
+                    return
+            # Failed polls return at once, and a sub-second poll interval means a zero long-poll
+            # timeout; either way, keep a floor between getUpdates calls.
+            min_gap = poll_interval_sec if not updates.get("ok") else _TELEGRAM_MIN_POLL_GAP_SEC
+            stop_watchers.wait(max(min_gap - (time.monotonic() - polled_at), 0.0))
+
+    def _watch_response_file(cancel_fd: int) -> None:
+        # One watch for the whole wait; the cancel pipe ends it instead of periodic re-checks.
+        try:
+            if wait_for_file(response_path, None, poll_interval_sec=poll_interval_sec, cancel_fd=cancel_fd):
+                with response_cv:
+                    response_cv.notify_all()
+        finally:
+            os.close(cancel_fd)
+
+    cancel_write_fd: Optional[int] = None
+    watchers: list[threading.Thread] = []
+    if poll_telegram:
+        cancel_read_fd, cancel_write_fd = os.pipe()
+        watchers = [
+            threading.Thread(target=_watch_telegram, daemon=True),
+            threading.Thread(target=_watch_response_file, args=(cancel_read_fd,), daemon=True),
+        ]
+        for watcher in watchers:
+            watcher.start()
+    try:
+        while True:
+            with response_cv:
+                if telegram_hits:
+                    stop_watchers.set()
+                    return "telegram", telegram_hits[0]
+                found, payload = _take_json_response(response_path)
+                if found and payload is not None:
+                    stop_watchers.set()
+                    return "ui", payload
+                elapsed = time.time() - start
+                if timeout_sec is not None and elapsed > timeout_sec:
+                    stop_watchers.set()
+                    raise RuntimeError(timeout_message)
+                wait_sec = None if timeout_sec is None else max(timeout_sec - elapsed, 0.0)
+                if poll_telegram and not found:
+                    response_cv.wait(wait_sec)
+                    continue
+            if found:
+                # Present but not parseable yet (still being written); retry shortly.
+                time.sleep(poll_interval_sec)
+            else:
+                wait_for_file(response_path, wait_sec, poll_interval_sec=poll_interval_sec)
+    finally:
+        with response_cv:
+            stop_watchers.set()
+        if cancel_write_fd is not None:
+            try:
+                os.write(cancel_write_fd, b"x")
+            except OSError:
+                pass
+            os.close(cancel_write_fd)
+        # Don't leave a getUpdates long poll running into the next prompt's poller (Telegram
+        # rejects concurrent getUpdates with 409).
+        for watcher in watchers:
+            watcher.join()
+
+
+def _take_json_response(path: str) -> tuple[bool, Optional[Dict[str, Any]]]:
+    """Read and consume a UI response file: returns (found, payload).
+
+    Opening directly (no exists() pre-check) tells "missing" apart from "present"; the file is
+    only removed once it parsed into an object, so a malformed one is retried on the next poll.
+    """
+    try:
+        with open(path, "rb") as f:
+            payload = json_loads(f.read())
+    except FileNotFoundError:
+        return False, None
+    except ValueError:
+        return True, None
+    if not isinstance(payload, dict):
+        return True, None
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+    return True, payload
+
+
+def _next_telegram_offset(updates: Dict[str, Any], offset: Optional[int]) -> Optional[int]:
+    """Return the getUpdates offset that acknowledges every update in `updates`."""
+    for item in updates.get("result", []):
+        update_id = item.get("update_id")
+        if isinstance(update_id, int):
+            next_offset = update_id + 1
+            if offset is None or next_offset > offset:
+                offset = next_offset
+    return offset
+
+
 def _await_admin_decision(
     *,
     state_manager: StateManager,
     options: List[Dict[str, Any]],
     ui_active: bool,
-    telegram: Optional[TelegramClient],
+    telegram: Optional["TelegramClient"],
     poll_interval_sec: float = 1.0,
     timeout_sec: Optional[float] = None,
 ) -> Dict[str, Any]:
@@ -295,8 +528,7 @@ def _await_admin_decision(
     state_manager.add_to_history(f"Awaiting admin decision request_id={request_id} ({len(options)} options).")
     request_path = os.path.join(state_manager.log_dir, f"admin_decision_request_{request_id}.json")
     response_path = os.path.join(state_manager.log_dir, f"admin_decision_response_{request_id}.json")
-    with open(request_path, "w") as f:
-        json.dump({"request_id": request_id, "options": options}, f, indent=2)
+    _write_json_if_absent(request_path, {"request_id": request_id, "options": options})
 
     if ui_active:
         print("Admin decision required. Please answer in the Luigi web UI.")
@@ -317,52 +549,27 @@ def _await_admin_decision(
             label=f"admin_decision_request:{request_id}",
         )
 
-    start = time.time()
-    offset = state_manager.get_state("telegram_update_offset")
-    if not isinstance(offset, int):
-        offset = None
-    while True:
-        # UI response file
-        if os.path.exists(response_path):
-            try:
-                with open(response_path, "r") as f:
-                    payload = json.load(f)
-            except json.JSONDecodeError:
-                payload = None
-            if not isinstance(payload, dict):
-                time.sleep(poll_interval_sec)
-                continue
-            try:
-                os.remove(response_path)
-            except OSError:
-                pass
-            choice = payload.get("choice")
-            notes = payload.get("notes", "")
-            state_manager.update_state("awaiting_admin_decision", None)
-            return {"choice": choice, "notes": notes, "source": "ui"}
-
-        # Telegram polling
-        if telegram:
-            updates = telegram.poll_updates(offset)
-            for item in updates.get("result", []):
-                update_id = item.get("update_id")
-                if isinstance(update_id, int):
-                    next_offset = update_id + 1
-                    if offset is None or next_offset > offset:
-                        offset = next_offset
-                        state_manager.update_state("telegram_update_offset", offset)
-            for message in telegram.filter_messages(updates):
-                text = str(message.get("text", "")).strip()
-                if not text:
-                    continue
-                parsed = _parse_admin_choice(text)
-                if parsed.get("choice") and parsed.get("request_id") == request_id:
-                    state_manager.update_state("awaiting_admin_decision", None)
-                    return {"choice": parsed.get("choice"), "notes": parsed.get("notes", ""), "source": "telegram"}
+    def _match_telegram(text: str) -> Optional[Dict[str, Any]]:
+        parsed = _parse_admin_choice(text)
+        if parsed.get("choice") and parsed.get("request_id") == request_id:
+            return parsed
+        return None
 
-        if timeout_sec is not None and (time.time() - start) > timeout_sec:
-            raise RuntimeError("Timed out waiting for admin decision.")
-        time.sleep(poll_interval_sec)
+    source, result = _poll_for_response(
+        response_path,
+        state_manager=state_manager,
+        telegram=telegram,
+        match_telegram=_match_telegram,
+        poll_interval_sec=poll_interval_sec,
+        timeout_sec=timeout_sec,
+        timeout_message="Timed out waiting for admin decision.",
+    )
+    state_manager.update_state("awaiting_admin_decision", None)
+    try:
+        os.remove(request_path)
+    except OSError:
+        pass
+    return {"choice": result.get("choice"), "notes": result.get("notes", ""), "source": source}
 
 
 def _preview_one_line(text: str, *, max_len: int = 220) -> str:
@@ -393,17 +600,20 @@ def _assign_executors(
     return assignments
 
 
-def _summarize_test_results(test_results: Dict[str, Any]) -> str:
+_NO_TESTS_SUMMARY = "No tests were run."
+
+
+def _summarize_test_results(test_results: Optional[Dict[str, Any]]) -> str:
+    """One line per test command (label and exit code); command output is never scanned."""
+    if not test_results:
+        return _NO_TESTS_SUMMARY
     commands = test_results.get("commands") if isinstance(test_results, dict) else None
     if not isinstance(commands, list) or not commands:
-        return "No tests were run."
-    parts = []
-    for cmd in commands:
-        result = cmd.get("result", {})
-        exit_code = result.get("exit_code")
-        label = cmd.get("label") or cmd.get("id") or "test"
-        parts.append(f"{label}: exit {exit_code}")
-    return "; ".join(parts)
+        return _NO_TESTS_SUMMARY
+    return "; ".join(
+        f"{cmd.get('label') or cmd.get('id') or 'test'}: exit {cmd.get('result', {}).get('exit_code')}"
+        for cmd in commands
+    )
 
 
 def _candidate_summary_text(candidate: Dict[str, Any]) -> str:
@@ -423,7 +633,10 @@ def _candidate_summary_text(candidate: Dict[str, Any]) -> str:
     return "\n".join(lines)
 
 
-def _validate_reviewer_decision(decision: Dict[str, Any], candidate_ids: set[str]) -> Dict[str, Any]:
+_REVIEWER_VERDICT_STATUSES = frozenset(("APPROVED", "REJECTED"))
+
+
+def _validate_reviewer_decision(decision: Dict[str, Any], candidate_ids: AbstractSet[str]) -> Dict[str, Any]:
     if not isinstance(decision, dict):
         raise RuntimeError("Reviewer decision invalid: expected an object.")
     status = decision.get("status")
@@ -432,7 +645,7 @@ def _validate_reviewer_decision(decision: Dict[str, Any], candidate_ids: set[str
         if not isinstance(questions, list) or not questions:
             raise RuntimeError("Reviewer decision invalid: NEEDS_USER_INPUT requires questions.")
         return decision
-    if status not in ("APPROVED", "REJECTED"):
+    if status not in _REVIEWER_VERDICT_STATUSES:
         raise RuntimeError(f"Reviewer decision invalid: unknown status {status!r}.")
     winner = decision.get("winner_candidate_id")
     if not isinstance(winner, str) or not winner.strip():
@@ -457,26 +670,16 @@ def _validate_reviewer_decision(decision: Dict[str, Any], candidate_ids: set[str
 
 
 def _compute_consensus(decisions: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
-    winner = None
-    next_prompt = None
-    status = None
-    for decision in decisions.values():
-        if decision.get("status") == "NEEDS_USER_INPUT":
-            return {"consensus": False, "winner": None, "next_prompt": None, "status": None}
-        if winner is None:
-            winner = decision.get("winner_candidate_id")
-            next_prompt = decision.get("next_prompt")
-            status = decision.get("status")
-        else:
-            if (
-                decision.get("status") != status
-                or decision.get("winner_candidate_id") != winner
-                or decision.get("next_prompt") != next_prompt
-            ):
-                return {"consensus": False, "winner": None, "next_prompt": None, "status": None}
-    if not winner:
-        return {"consensus": False, "winner": None, "next_prompt": None, "status": None}
-    return {"consensus": True, "winner": winner, "next_prompt": next_prompt, "status": status}
+    # Unanimity check: all reviewers must agree on (status, winner, next_prompt).
+    votes = {
+        (d.get("status"), d.get("winner_candidate_id"), d.get("next_prompt"))
+        for d in decisions.values()
+    }
+    if len(votes) == 1:
+        status, winner, next_prompt = votes.pop()
+        if winner and status != "NEEDS_USER_INPUT":
+            return {"consensus": True, "winner": winner, "next_prompt": next_prompt, "status": status}
+    return {"consensus": False, "winner": None, "next_prompt": None, "status": None}
 
 
 def _run_reviewer_plan(
@@ -529,6 +732,11 @@ def _run_reviewer_decision(
     return output
 
 
+def _plan_prompt_text(plan: Dict[str, Any]) -> str:
+    """Return the executor-facing plan text; falls back to compact plan JSON."""
+    return plan.get("claude_prompt") or json.dumps(plan, separators=(",", ":"))
+
+
 def _run_executor_candidate(
     *,
     executor: AgentSpec,
@@ -553,7 +761,7 @@ def _run_executor_candidate(
         summary = structured.get("summary") if isinstance(structured.get("summary"), str) else None
         return {"status": status, "summary": summary, "notes": None, "raw": output}
 
-    prompt = plan.get("claude_prompt") or json.dumps(plan, indent=2)
+    prompt = _plan_prompt_text(plan)
     prompt = (
         "PHASE: EXECUTE\n"
         "You are the executor. Implement the plan in this workspace.\n"
@@ -582,61 +790,68 @@ def run_multi_agent_session(
     assignment: Dict[str, Any],
     repo_path: str,
     ui,
-    telegram_client: Optional[TelegramClient],
+    telegram_client: Optional["TelegramClient"],
     user_input_poll_interval_sec: float,
     user_input_timeout_sec: Optional[float],
     resuming: bool = False,
 ) -> Dict[str, Any]:
-    session_mode = bool(config.get("orchestrator", {}).get("session_mode", False))
+    orch_cfg = config.get("orchestrator") or {}
+    session_mode = bool(orch_cfg.get("session_mode", False))
     max_iterations = _optional_positive_int(
-        config.get("orchestrator", {}).get("max_iterations", 1),
+        orch_cfg.get("max_iterations", 1),
         default=1,
     )
     max_reviewer_feedback_rounds = _optional_positive_int(
-        config.get("orchestrator", {}).get("max_claude_question_rounds", 5),
+        orch_cfg.get("max_claude_question_rounds", 5),
         default=5,
     )
-    branch_prefix = config.get("orchestrator", {}).get("branch_prefix", "luigi")
+    # Cap on concurrently executing candidates (None = one worker per pending candidate).
+    max_parallel_candidates = _optional_positive_int(
+        orch_cfg.get("max_parallel_candidates"),
+        default=None,
+    )
+    # Cap on concurrent reviewer CLI calls per fan-out (None = one worker per reviewer).
+    max_parallel_reviewers = _optional_positive_int(
+        orch_cfg.get("max_parallel_reviewers"),
+        default=None,
+    )
+    branch_prefix = orch_cfg.get("branch_prefix", "luigi")
     try:
-        branch_name_length = int(config.get("orchestrator", {}).get("branch_name_length", 8))
+        branch_name_length = int(orch_cfg.get("branch_name_length", 8))
     except Exception:
         branch_name_length = 8
     try:
         branch_suffix_length = int(
-            config.get("orchestrator", {}).get("branch_suffix_length", 6)
+            orch_cfg.get("branch_suffix_length", 6)
         )
     except Exception:
         branch_suffix_length = 6
-    workspace_strategy = config.get("orchestrator", {}).get("workspace_strategy", "auto")
-    use_git_worktree = config.get("orchestrator", {}).get("use_git_worktree", True)
-    cleanup_policy = config.get("orchestrator", {}).get(
+    workspace_strategy = orch_cfg.get("workspace_strategy", "auto")
+    use_git_worktree = orch_cfg.get("use_git_worktree", True)
+    cleanup_policy = orch_cfg.get(
         "cleanup", "on_success"
     )  # always | on_success | never
-    apply_changes_on_success = config.get("orchestrator", {}).get("apply_changes_on_success", True)
-    commit_on_approval = config.get("orchestrator", {}).get("commit_on_approval", True)
-    commit_message_template = config.get("orchestrator", {}).get("commit_message", "Task complete: {task}")
-    auto_merge_on_approval = bool(config.get("orchestrator", {}).get("auto_merge_on_approval", False))
-    merge_target_branch = config.get("orchestrator", {}).get("merge_target_branch", "main")
-    merge_style = config.get("orchestrator", {}).get("merge_style", "merge_commit")
-    dirty_main_policy = config.get("orchestrator", {}).get("dirty_main_policy", "commit")
-    dirty_main_commit_message_template = config.get(
-        "orchestrator",
-        {},
-    ).get(
+    apply_changes_on_success = orch_cfg.get("apply_changes_on_success", True)
+    commit_on_approval = orch_cfg.get("commit_on_approval", True)
+    commit_message_template = orch_cfg.get("commit_message", "Task complete: {task}")
+    auto_merge_on_approval = bool(orch_cfg.get("auto_merge_on_approval", False))
+    merge_target_branch = orch_cfg.get("merge_target_branch", "main")
+    merge_style = orch_cfg.get("merge_style", "merge_commit")
+    merge_use_rerere = bool(orch_cfg.get("merge_use_rerere", True))
+    user_context_max_entries = _optional_positive_int(orch_cfg.get("user_context_max_entries"), default=None)
+    dirty_main_policy = orch_cfg.get("dirty_main_policy", "commit")
+    dirty_main_commit_message_template = orch_cfg.get(
         "dirty_main_commit_message",
         "Auto-commit local changes before Luigi merge (run {run_id})",
     )
-    merge_commit_message_template = config.get(
-        "orchestrator",
-        {},
-    ).get(
+    merge_commit_message_template = orch_cfg.get(
         "merge_commit_message",
         "Merge {branch} into {target} (run {run_id})",
     )
-    delete_branch_on_merge = bool(config.get("orchestrator", {}).get("delete_branch_on_merge", True))
-    delete_worktree_on_merge = bool(config.get("orchestrator", {}).get("delete_worktree_on_merge", True))
+    delete_branch_on_merge = bool(orch_cfg.get("delete_branch_on_merge", True))
+    delete_worktree_on_merge = bool(orch_cfg.get("delete_worktree_on_merge", True))
     carry_forward_between_iterations = bool(
-        config.get("orchestrator", {}).get("carry_forward_workspace_between_iterations", True)
+        orch_cfg.get("carry_forward_workspace_between_iterations", True)
     )
 
     if len(executors) > 1 and workspace_strategy == "in_place":
@@ -697,11 +912,12 @@ def run_multi_agent_session(
             "- Use null or empty arrays for fields that do not apply.\n"
             "If you need clarification from the user to answer, do NOT guess. Output JSON with:\n"
             '  {"status":"NEEDS_USER_INPUT","questions":["..."]}\n'
+            f"  {BATCH_QUESTIONS_INSTRUCTION}\n"
             "Otherwise output JSON with:\n"
             '  {"status":"ANSWER","answer":"..."}\n'
             "Output MUST be valid JSON matching the provided schema.\n\n"
-            f"Executor questions:\n{json.dumps(questions, indent=2)}\n\n"
             f"Context JSON:\n{json.dumps(context, indent=2)}\n\n"
+            f"Executor questions:\n{json.dumps(questions, indent=2)}\n\n"
             + (f"User context / answers:\n{user_context}\n" if user_context else "")
         )
 
@@ -755,6 +971,11 @@ def run_multi_agent_session(
             _sync_global_agent_status_locked(runtime)
             state_manager.save_state()
 
+    def _reviewer_workers() -> int:
+        if max_parallel_reviewers is None:
+            return len(reviewers)
+        return min(len(reviewers), max_parallel_reviewers)
+
     def _run_with_agent_status(agent: AgentSpec, *, phase: str, fn):
         state_manager.add_to_history(f"{agent.role} {agent.id} ({agent.kind}) Running: {phase}")
         _set_agent_runtime(agent, status="Running", phase=phase)
@@ -771,11 +992,9 @@ def run_multi_agent_session(
     resume_state = state_manager.state if resuming else {}
     resume_stage = resume_state.get("stage") if isinstance(resume_state.get("stage"), str) else None
     resume_iteration = int(resume_state.get("iteration") or 0) if resuming else 0
-    resume_plans = resume_state.get("plans") if isinstance(resume_state.get("plans"), dict) else None
-    resume_candidates = (
-        resume_state.get("candidates") if isinstance(resume_state.get("candidates"), dict) else None
-    )
-    resume_reviews = resume_state.get("reviews") if isinstance(resume_state.get("reviews"), dict) else None
+    resume_plans = _dict_or_none(resume_state.get("plans"))
+    resume_candidates = _dict_or_none(resume_state.get("candidates"))
+    resume_reviews = _dict_or_none(resume_state.get("reviews"))
     resume_used = False
 
     while True:
@@ -788,14 +1007,12 @@ def run_multi_agent_session(
                 timeout_sec=user_input_timeout_sec,
             )
         session_index += 1
-        state_manager.update_state("session_index", session_index)
-        state_manager.update_state("task", task)
-        state_manager.update_state("run_status", "running")
+        state_manager.update_many({"session_index": session_index, "task": task, "run_status": "running"})
+        _register_resume_candidate(state_manager.logs_root, original_repo_path, state_manager.run_id)
         _note(f"Session {session_index} started. Task: {task}")
 
-        user_qna = state_manager.get_state("user_qna") or []
-        if not isinstance(user_qna, list):
-            user_qna = []
+        user_qna = state_manager.load_user_qna()
+        qna_context = _UserContext(user_qna, max_entries=user_context_max_entries)
 
         def _ask_one_reviewer(
             reviewer: AgentSpec,
@@ -813,14 +1030,14 @@ def run_multi_agent_session(
                     answer = codex_clients[reviewer.id].answer_executor(
                         questions=questions,
                         context=context,
-                        user_context=_format_user_context(user_qna),
+                        user_context=qna_context.render(),
                         cwd=cwd,
                     )
                 else:
                     prompt = _reviewer_answer_prompt(
                         questions=questions,
                         context=context,
-                        user_context=_format_user_context(user_qna),
+                        user_context=qna_context.render(),
                     )
                     answer = claude_clients[reviewer.id].run_structured(
                         prompt=prompt,
@@ -841,14 +1058,16 @@ def run_multi_agent_session(
                 with user_input_lock:
                     prev_stage = state_manager.get_state("stage")
                     new_qna = _prompt_user_for_answers(
-                        [str(q) for q in user_questions],
+                        user_questions,
                         state_manager=state_manager,
+                        answered=qna_context.answered(),
                         ui_active=ui is not None and ui.is_running(),
                         poll_interval_sec=user_input_poll_interval_sec,
                         timeout_sec=user_input_timeout_sec,
                     )
                     user_qna.extend(new_qna)
-                    state_manager.update_state("user_qna", user_qna)
+                    qna_context.add(new_qna)
+                    state_manager.add_user_qna(new_qna)
                     if isinstance(prev_stage, str) and prev_stage:
                         state_manager.update_state("stage", prev_stage)
 
@@ -888,6 +1107,10 @@ def run_multi_agent_session(
         merged_to_target_branch = False
         iteration = 0
         final_selected_candidate = None
+        # Per-iteration candidate summaries, reused for follow-up decisions and the handoff.
+        candidate_summaries: Dict[str, str] = {}
+        # Reviewer decisions from a consensus approval; reused as the handoff.
+        consensus_decisions: Optional[Dict[str, Dict[str, Any]]] = None
         final_workspace = None
         state_manager.update_state("approved", False)
 
@@ -948,7 +1171,7 @@ def run_multi_agent_session(
                 admin_choice = _await_admin_decision(
                     state_manager=state_manager,
                     options=options,
-                    ui_active=ui_active,
+                    ui_active=ui is not None and ui.is_running(),
                     telegram=telegram_client,
                     poll_interval_sec=user_input_poll_interval_sec,
                     timeout_sec=user_input_timeout_sec,
@@ -966,8 +1189,12 @@ def run_multi_agent_session(
                 state_manager.add_to_history(
                     "Admin accepted partial result after reaching max iterations."
                 )
-                state_manager.update_state("max_iterations_missing_summary", missing_summary)
-                state_manager.update_state("approved_by_admin", True)
+                state_manager.update_many(
+                    {
+                        "max_iterations_missing_summary": missing_summary,
+                        "approved_by_admin": True,
+                    }
+                )
                 approved = True
                 state_manager.update_state("approved", True)
 
@@ -987,8 +1214,9 @@ def run_multi_agent_session(
                                 task=commit_task or task, run_id=state_manager.run_id
                             )
                             commit_sha = selected_workspace.commit_changes(commit_message)
-                            state_manager.update_state("commit_sha", commit_sha)
-                            state_manager.update_state("branch_name", selected_workspace.branch_name)
+                            state_manager.update_many(
+                                {"commit_sha": commit_sha, "branch_name": selected_workspace.branch_name}
+                            )
                             if selected_workspace.branch_name:
                                 print(f"Committed to branch: {selected_workspace.branch_name}")
                             if commit_sha:
@@ -996,7 +1224,7 @@ def run_multi_agent_session(
                             if auto_merge_on_approval:
                                 merge_branch = selected_workspace.branch_name
                                 merge_message = merge_commit_message_template.format(
-                                    task=str(state_manager.get_state("task") or ""),
+                                    task=str(commit_task or ""),
                                     run_id=state_manager.run_id,
                                     branch=merge_branch or "",
                                     target=merge_target_branch,
@@ -1013,10 +1241,14 @@ def run_multi_agent_session(
                                     selected_plan = reviewer_plans.get(
                                         final_selected_candidate.get("reviewer_id")
                                     )
-                                state_manager.update_state("merge_branch", merge_branch)
-                                state_manager.update_state("merge_target_branch", merge_target_branch)
-                                state_manager.update_state("stage", "merging")
-                                state_manager.update_state("merge_status", "running")
+                                state_manager.update_many(
+                                    {
+                                        "merge_branch": merge_branch,
+                                        "merge_target_branch": merge_target_branch,
+                                        "stage": "merging",
+                                        "merge_status": "running",
+                                    }
+                                )
                                 merge_result = _auto_merge_worktree_branch(
                                     repo_path=original_repo_path,
                                     branch_name=merge_branch,
@@ -1026,33 +1258,15 @@ def run_multi_agent_session(
                                     dirty_main_commit_message_template=dirty_message_template,
                                     merge_commit_message=merge_message,
                                     claude_client=merge_client,
-                                    task=str(state_manager.get_state("task") or task or ""),
+                                    task=str(commit_task or task or ""),
                                     run_id=state_manager.run_id,
                                     plan=selected_plan,
                                     reviewer_decisions=reviewer_decisions,
                                     candidate=final_selected_candidate,
                                     note_fn=_note,
+                                    use_rerere=merge_use_rerere,
                                 )
-                                state_manager.update_state(
-                                    "merge_status",
-                                    "merged" if merge_result.get("merged") else "failed",
-                                )
-                                state_manager.update_state(
-                                    "merge_commit_sha", merge_result.get("merge_commit_sha")
-                                )
-                                state_manager.update_state(
-                                    "dirty_main_commit_sha",
-                                    merge_result.get("dirty_main_commit_sha"),
-                                )
-                                if merge_result.get("conflict_files"):
-                                    state_manager.update_state(
-                                        "merge_conflict_files", merge_result.get("conflict_files")
-                                    )
-                                if merge_result.get("claude_merge_summary"):
-                                    state_manager.update_state(
-                                        "merge_resolution_summary",
-                                        merge_result.get("claude_merge_summary"),
-                                    )
+                                state_manager.update_many(_merge_result_state(merge_result))
                                 if merge_result.get("merged"):
                                     persisted = True
                                     merged_to_target_branch = True
@@ -1079,9 +1293,8 @@ def run_multi_agent_session(
                         persisted = False
                         state_manager.add_to_history(f"Persistence step failed: {e}")
                         print(f"Persistence step failed: {e}")
-                    state_manager.update_state("persisted", persisted)
-                    state_manager.update_state(
-                        "stage", "complete" if persisted else "persistence_failed"
+                    state_manager.update_many(
+                        {"persisted": persisted, "stage": "complete" if persisted else "persistence_failed"}
                     )
                 else:
                     persisted = False
@@ -1100,16 +1313,16 @@ def run_multi_agent_session(
             use_resume_plans = (
                 is_resume_iteration
                 and resume_plans
-                and resume_stage in ("plan_ready", "executing", "tests_ready", "reviewing", "review_ready")
+                and resume_stage in _PLANS_SETTLED_STAGES
             )
             if use_resume_plans:
                 reviewer_plans = resume_plans
-                state_manager.update_state("plans", reviewer_plans)
-                state_manager.update_state("stage", "plan_ready")
+                state_manager.update_many({"plans": reviewer_plans, "stage": "plan_ready"})
                 _note(f"Iteration {iteration}: resuming from existing plans.")
             else:
                 state_manager.update_state("stage", "planning")
                 _note(f"Iteration {iteration}: planning with {len(reviewers)} reviewers...")
+                plan_user_context = qna_context.render()
 
                 def _plan_one(reviewer: AgentSpec) -> Dict[str, Any]:
                     return _run_with_agent_status(
@@ -1120,13 +1333,13 @@ def run_multi_agent_session(
                             codex_clients=codex_clients,
                             claude_clients=claude_clients,
                             task=task or "",
-                            user_context=_format_user_context(user_qna),
+                            user_context=plan_user_context,
                             cwd=current_repo_path,
                             plan_schema=plan_schema,
                         ),
                     )
 
-                with ThreadPoolExecutor(max_workers=len(reviewers)) as pool:
+                with ThreadPoolExecutor(max_workers=_reviewer_workers()) as pool:
                     futures = {pool.submit(_plan_one, reviewer): reviewer for reviewer in reviewers}
                     for future in as_completed(futures):
                         reviewer = futures[future]
@@ -1158,14 +1371,16 @@ def run_multi_agent_session(
                         _note(f"Reviewer {reviewer.id} requested clarification questions.")
                         questions = plan.get("questions", [])
                         new_qna = _prompt_user_for_answers(
-                            [str(q) for q in questions],
+                            questions,
                             state_manager=state_manager,
+                            answered=qna_context.answered(),
                             ui_active=ui is not None and ui.is_running(),
                             poll_interval_sec=user_input_poll_interval_sec,
                             timeout_sec=user_input_timeout_sec,
                         )
                         user_qna.extend(new_qna)
-                        state_manager.update_state("user_qna", user_qna)
+                        qna_context.add(new_qna)
+                        state_manager.add_user_qna(new_qna)
                         plan = _run_with_agent_status(
                             reviewer,
                             phase="plan_followup",
@@ -1174,15 +1389,14 @@ def run_multi_agent_session(
                                 codex_clients=codex_clients,
                                 claude_clients=claude_clients,
                                 task=task or "",
-                                user_context=_format_user_context(user_qna),
+                                user_context=qna_context.render(),
                                 cwd=current_repo_path,
                                 plan_schema=plan_schema,
                             ),
                         )
                         reviewer_plans[reviewer.id] = plan
 
-                state_manager.update_state("plans", reviewer_plans)
-                state_manager.update_state("stage", "plan_ready")
+                state_manager.update_many({"plans": reviewer_plans, "stage": "plan_ready"})
 
             reviewer_ids = list(reviewer_plans.keys())
             assignments = _assign_executors(
@@ -1283,107 +1497,132 @@ def run_multi_agent_session(
             else:
                 _note(f"Iteration {iteration}: all candidates already completed; skipping execution.")
 
+            # Set when the iteration is aborted so in-flight candidates stop before their next agent round.
+            candidates_cancelled = threading.Event()
+            cancelled_result = {"status": "FAILED", "summary": "Candidate cancelled.", "notes": None}
+
             def _execute_candidate(candidate_id: str) -> Dict[str, Any]:
                 candidate = dict(candidates[candidate_id])
                 plan = reviewer_plans[candidate["reviewer_id"]]
                 executor = next(e for e in executors if e.id == candidate["executor_id"])
                 workspace = candidate_workspaces[candidate_id]
                 reviewers_to_ask = [r for r in reviewers if r.id in reviewer_plans] or list(reviewers)
+                # Serialize the plan once per candidate; executor feedback rounds reuse it.
+                plan_prompt = _plan_prompt_text(plan)
+
+                # Per-candidate context; each feedback round copies these few keys and adds the
+                # executor summary.
+                base_context: Dict[str, Any] = {
+                    "task": task,
+                    "iteration": iteration,
+                    "candidate_id": candidate_id,
+                    "reviewer_id": candidate.get("reviewer_id"),
+                    "executor_id": executor.id,
+                    "workspace_path": workspace.path,
+                }
 
                 def _run_executor_with_reviewer_feedback() -> Dict[str, Any]:
-                    base_context: Dict[str, Any] = {
-                        "task": task,
-                        "iteration": iteration,
-                        "candidate_id": candidate_id,
-                        "reviewer_id": candidate.get("reviewer_id"),
-                        "executor_id": executor.id,
-                        "workspace_path": workspace.path,
-                    }
-
                     feedback_round = 0
 
                     if executor.kind == "claude":
                         session_id = None
                         prompt: Any = plan
-                        while True:
-                            output = claude_clients[executor.id].implement(
-                                prompt,
-                                session_id=session_id,
-                                cwd=workspace.path,
-                                json_schema=CLAUDE_STRUCTURED_SCHEMA,
-                                append_system_prompt=CLAUDE_APPEND_SYSTEM_PROMPT,
-                            )
-                            if not output:
-                                return {"status": "FAILED", "summary": "Claude executor failed.", "notes": None}
 
-                            session_id = output.get("session_id") or session_id
-                            structured = _get_claude_structured(output)
-                            status = structured.get("status")
-                            summary = structured.get("summary") if isinstance(structured.get("summary"), str) else None
+                        def _on_claude_done(summary: Optional[str], structured: Dict[str, Any], output: Dict[str, Any]):
+                            return {
+                                "status": "DONE",
+                                "summary": summary,
+                                "notes": None,
+                                "raw": output,
+                            }
 
-                            if status == "DONE":
+                        def _on_claude_needs_reviewer(
+                            summary: Optional[str], structured: Dict[str, Any], output: Dict[str, Any]
+                        ):
+                            nonlocal feedback_round, prompt
+                            questions = structured.get("questions", [])
+                            if not isinstance(questions, list) or not questions:
                                 return {
-                                    "status": "DONE",
-                                    "summary": summary,
+                                    "status": "FAILED",
+                                    "summary": "Executor requested reviewer input without questions.",
                                     "notes": None,
                                     "raw": output,
                                 }
 
-                            if status in ("NEEDS_REVIEWER", "NEEDS_CODEX"):
-                                questions = structured.get("questions", [])
-                                if not isinstance(questions, list) or not questions:
-                                    return {
-                                        "status": "FAILED",
-                                        "summary": "Executor requested reviewer input without questions.",
-                                        "notes": None,
-                                        "raw": output,
-                                    }
-
-                                feedback_round += 1
-                                if (
-                                    max_reviewer_feedback_rounds is not None
-                                    and feedback_round > max_reviewer_feedback_rounds
-                                ):
-                                    return {
-                                        "status": "FAILED",
-                                        "summary": "Executor exceeded max reviewer feedback rounds.",
-                                        "notes": None,
-                                        "raw": output,
-                                    }
+                            feedback_round += 1
+                            if (
+                                max_reviewer_feedback_rounds is not None
+                                and feedback_round > max_reviewer_feedback_rounds
+                            ):
+                                return {
+                                    "status": "FAILED",
+                                    "summary": "Executor exceeded max reviewer feedback rounds.",
+                                    "notes": None,
+                                    "raw": output,
+                                }
 
-                                state_manager.add_to_history(
-                                    f"Executor {executor.id} requested reviewer feedback (round {feedback_round})."
-                                )
-                                ctx = dict(base_context)
-                                ctx["executor_summary"] = summary
-                                reviewers_text = _ask_reviewers(
-                                    questions=[str(q) for q in questions],
-                                    context=ctx,
-                                    cwd=workspace.path,
-                                    phase_prefix=f"answer_executor:{candidate_id}:r{feedback_round}",
-                                    reviewers_to_ask=reviewers_to_ask,
-                                )
-                                prompt = (
-                                    "Continue implementing the plan.\n\n"
-                                    "Here are answers from the reviewers to your questions:\n"
-                                    f"{reviewers_text}\n"
-                                )
-                                continue
+                            state_manager.add_to_history(
+                                f"Executor {executor.id} requested reviewer feedback (round {feedback_round})."
+                            )
+                            ctx = {**base_context, "executor_summary": summary}
+                            reviewers_text = _ask_reviewers(
+                                questions=[str(q) for q in questions],
+                                context=ctx,
+                                cwd=workspace.path,
+                                phase_prefix=f"answer_executor:{candidate_id}:r{feedback_round}",
+                                reviewers_to_ask=reviewers_to_ask,
+                            )
+                            prompt = (
+                                "Continue implementing the plan.\n\n"
+                                "Here are answers from the reviewers to your questions:\n"
+                                f"{reviewers_text}\n"
+                            )
+                            return None
 
+                        def _on_claude_other(summary: Optional[str], structured: Dict[str, Any], output: Dict[str, Any]):
                             # Unknown/FAILED status: stop and surface summary.
                             return {
                                 "status": "FAILED",
-                                "summary": summary or f"Executor returned status {status!r}.",
+                                "summary": summary or f"Executor returned status {structured.get('status')!r}.",
                                 "notes": None,
                                 "raw": output,
                             }
 
+                        # Handlers return the final result, or None to run another executor round.
+                        claude_status_handlers = {
+                            "DONE": _on_claude_done,
+                            "NEEDS_REVIEWER": _on_claude_needs_reviewer,
+                            "NEEDS_CODEX": _on_claude_needs_reviewer,
+                        }
+                        while True:
+                            if candidates_cancelled.is_set():
+                                return dict(cancelled_result)
+                            output = claude_clients[executor.id].implement(
+                                prompt,
+                                session_id=session_id,
+                                cwd=workspace.path,
+                                json_schema=CLAUDE_STRUCTURED_SCHEMA,
+                                append_system_prompt=CLAUDE_APPEND_SYSTEM_PROMPT,
+                            )
+                            if not output:
+                                return {"status": "FAILED", "summary": "Claude executor failed.", "notes": None}
+
+                            session_id = output.get("session_id") or session_id
+                            structured = _get_claude_structured(output)
+                            summary = structured.get("summary")
+                            if not isinstance(summary, str):
+                                summary = None
+                            handler = claude_status_handlers.get(structured.get("status"), _on_claude_other)
+                            result = handler(summary, structured, output)
+                            if result is not None:
+                                return result
+
                     # Codex executor
-                    plan_prompt = plan.get("claude_prompt") or json.dumps(plan, indent=2)
                     prompt = (
                         "PHASE: EXECUTE\n"
                         "You are the executor. Implement the plan in this workspace.\n"
                         "If you need clarification from reviewers, output JSON with status NEEDS_REVIEWER and a non-empty questions array.\n"
+                        "Batch your questions: include every open question in that one array instead of asking one per round.\n"
                         "When finished, output JSON matching the executor_result schema.\n"
                         '- Always include: status, questions, summary, notes. Use status "DONE", "FAILED", or "NEEDS_REVIEWER".\n'
                         "- Set questions to [] (or null) unless status is NEEDS_REVIEWER.\n"
@@ -1391,6 +1630,8 @@ def run_multi_agent_session(
                         f"Plan prompt:\n{plan_prompt}\n"
                     )
                     while True:
+                        if candidates_cancelled.is_set():
+                            return dict(cancelled_result)
                         output = codex_clients[executor.id].run_structured(
                             prompt=prompt,
                             schema_path=_executor_result_schema_path(),
@@ -1429,8 +1670,7 @@ def run_multi_agent_session(
                         state_manager.add_to_history(
                             f"Executor {executor.id} requested reviewer feedback (round {feedback_round})."
                         )
-                        ctx = dict(base_context)
-                        ctx["executor_summary"] = output.get("summary")
+                        ctx = {**base_context, "executor_summary": output.get("summary")}
                         reviewers_text = _ask_reviewers(
                             questions=[str(q) for q in questions],
                             context=ctx,
@@ -1452,29 +1692,46 @@ def run_multi_agent_session(
                 candidate["executor_output"] = exec_output
                 candidate["executor_summary"] = exec_output.get("summary") if isinstance(exec_output, dict) else None
                 candidate["status"] = "DONE" if exec_output.get("status") == "DONE" else "FAILED"
+                if candidates_cancelled.is_set():
+                    return candidate
                 plan_test_commands = plan.get("test_commands") if isinstance(plan, dict) else None
                 test_results = run_tests(cwd=workspace.path, config=config, test_commands=plan_test_commands)
                 candidate["test_results"] = test_results
                 candidate["test_summary"] = _summarize_test_results(test_results)
                 diff = workspace.get_diff()
                 candidate["diff"] = diff
-                candidate["diff_preview"] = "\n".join(diff.splitlines()[:40]) if diff else ""
+                candidate["diff_preview"] = _head_lines(diff, 40)
                 return candidate
 
             if pending_ids:
-                with ThreadPoolExecutor(max_workers=len(pending_ids)) as pool:
+                workers = len(pending_ids)
+                if max_parallel_candidates is not None:
+                    workers = min(workers, max_parallel_candidates)
+                with ThreadPoolExecutor(max_workers=workers) as pool:
                     futures = {pool.submit(_execute_candidate, cid): cid for cid in pending_ids}
-                    for future in as_completed(futures):
-                        cid = futures[future]
-                        try:
-                            candidates[cid] = future.result()
-                        except Exception as exc:
-                            candidates[cid] = dict(candidates[cid])
-                            candidates[cid]["status"] = "FAILED"
-                            candidates[cid]["error"] = str(exc)
-                            state_manager.add_to_history(f"Candidate {cid} crashed: {exc}")
-                        state_manager.update_state("candidates", candidates)
-                        _note(f"Candidate {cid} finished: {candidates[cid].get('status')}")
+                    try:
+                        for future in as_completed(futures):
+                            cid = futures[future]
+                            try:
+                                candidates[cid] = future.result()
+                            except Exception as exc:
+                                # Rebuild rather than mutate: earlier snapshots handed to the deferred
+                                # state writer still reference the old dict.
+                                candidates[cid] = {**candidates[cid], "status": "FAILED", "error": str(exc)}
+                                state_manager.add_to_history_deferred(f"Candidate {cid} crashed: {exc}")
+                            # Coalesce per-candidate writes; a snapshot keeps the timer thread off the live dict.
+                            state_manager.update_state_deferred("candidates", dict(candidates))
+                            finished_msg = f"Candidate {cid} finished: {candidates[cid].get('status')}"
+                            print(finished_msg)
+                            state_manager.add_to_history_deferred(finished_msg)
+                    except BaseException:
+                        # Aborting (e.g. Ctrl-C): drop queued candidates and stop running ones early.
+                        candidates_cancelled.set()
+                        for future in futures:
+                            future.cancel()
+                        state_manager.flush_deferred()
+                        raise
+                state_manager.flush_deferred()
 
                 state_manager.update_state("stage", "tests_ready")
                 _note("All candidates finished.")
@@ -1484,7 +1741,8 @@ def run_multi_agent_session(
                 else:
                     state_manager.update_state("stage", "tests_ready")
 
-            candidates_text = "\n\n".join(_candidate_summary_text(c) for c in candidates.values())
+            candidate_summaries = {cid: _candidate_summary_text(c) for cid, c in candidates.items()}
+            candidates_text = "\n\n".join(candidate_summaries.values())
             use_resume_reviews = (
                 is_resume_iteration and resume_reviews and resume_stage == "review_ready"
             )
@@ -1500,7 +1758,7 @@ def run_multi_agent_session(
                 decision_prompt = _review_candidates_prompt(
                     task=task,
                     candidates_text=candidates_text,
-                    user_context=_format_user_context(user_qna),
+                    user_context=qna_context.render(),
                     final_handoff=False,
                 )
 
@@ -1518,7 +1776,7 @@ def run_multi_agent_session(
                         ),
                     )
 
-                with ThreadPoolExecutor(max_workers=len(reviewers)) as pool:
+                with ThreadPoolExecutor(max_workers=_reviewer_workers()) as pool:
                     futures = {pool.submit(_decide_one, reviewer): reviewer for reviewer in reviewers}
                     for future in as_completed(futures):
                         reviewer = futures[future]
@@ -1539,14 +1797,16 @@ def run_multi_agent_session(
                                 "Reviewer returned NEEDS_USER_INPUT without questions."
                             )
                         new_qna = _prompt_user_for_answers(
-                            [str(q) for q in questions],
+                            questions,
                             state_manager=state_manager,
+                            answered=qna_context.answered(),
                             ui_active=ui is not None and ui.is_running(),
                             poll_interval_sec=user_input_poll_interval_sec,
                             timeout_sec=user_input_timeout_sec,
                         )
                         user_qna.extend(new_qna)
-                        state_manager.update_state("user_qna", user_qna)
+                        qna_context.add(new_qna)
+                        state_manager.add_user_qna(new_qna)
                         decision = _run_with_agent_status(
                             reviewer,
                             phase="review_candidates_followup",
@@ -1557,7 +1817,7 @@ def run_multi_agent_session(
                                 prompt=_review_candidates_prompt(
                                     task=task,
                                     candidates_text=candidates_text,
-                                    user_context=_format_user_context(user_qna),
+                                    user_context=qna_context.render(),
                                     final_handoff=False,
                                 ),
                                 cwd=current_repo_path,
@@ -1566,7 +1826,7 @@ def run_multi_agent_session(
                         )
                         reviewer_decisions[reviewer.id] = decision
 
-            candidate_ids = set(candidates.keys())
+            candidate_ids = frozenset(candidates)
             validated_decisions: Dict[str, Dict[str, Any]] = {}
             decision_errors: Dict[str, Any] = {}
             for reviewer in reviewers:
@@ -1620,14 +1880,14 @@ def run_multi_agent_session(
                     }
                 }
 
-            state_manager.update_state("reviews", reviewer_decisions)
-            state_manager.update_state("stage", "review_ready")
+            state_manager.update_many({"reviews": reviewer_decisions, "stage": "review_ready"})
 
             consensus_result = _compute_consensus(reviewer_decisions)
             winner = consensus_result.get("winner")
             next_prompt = consensus_result.get("next_prompt")
             status = consensus_result.get("status")
             consensus = bool(consensus_result.get("consensus"))
+            consensus_decisions = reviewer_decisions if consensus and status == "APPROVED" else None
 
             if not consensus:
                 options = []
@@ -1690,8 +1950,9 @@ def run_multi_agent_session(
                                 task=task, run_id=state_manager.run_id
                             )
                             commit_sha = selected_workspace.commit_changes(commit_message)
-                            state_manager.update_state("commit_sha", commit_sha)
-                            state_manager.update_state("branch_name", selected_workspace.branch_name)
+                            state_manager.update_many(
+                                {"commit_sha": commit_sha, "branch_name": selected_workspace.branch_name}
+                            )
                             if selected_workspace.branch_name:
                                 print(f"Committed to branch: {selected_workspace.branch_name}")
                             if commit_sha:
@@ -1716,10 +1977,14 @@ def run_multi_agent_session(
                                     selected_plan = reviewer_plans.get(
                                         final_selected_candidate.get("reviewer_id")
                                     )
-                                state_manager.update_state("merge_branch", merge_branch)
-                                state_manager.update_state("merge_target_branch", merge_target_branch)
-                                state_manager.update_state("stage", "merging")
-                                state_manager.update_state("merge_status", "running")
+                                state_manager.update_many(
+                                    {
+                                        "merge_branch": merge_branch,
+                                        "merge_target_branch": merge_target_branch,
+                                        "stage": "merging",
+                                        "merge_status": "running",
+                                    }
+                                )
                                 merge_result = _auto_merge_worktree_branch(
                                     repo_path=original_repo_path,
                                     branch_name=merge_branch,
@@ -1735,27 +2000,9 @@ def run_multi_agent_session(
                                     reviewer_decisions=reviewer_decisions,
                                     candidate=final_selected_candidate,
                                     note_fn=_note,
+                                    use_rerere=merge_use_rerere,
                                 )
-                                state_manager.update_state(
-                                    "merge_status",
-                                    "merged" if merge_result.get("merged") else "failed",
-                                )
-                                state_manager.update_state(
-                                    "merge_commit_sha", merge_result.get("merge_commit_sha")
-                                )
-                                state_manager.update_state(
-                                    "dirty_main_commit_sha",
-                                    merge_result.get("dirty_main_commit_sha"),
-                                )
-                                if merge_result.get("conflict_files"):
-                                    state_manager.update_state(
-                                        "merge_conflict_files", merge_result.get("conflict_files")
-                                    )
-                                if merge_result.get("claude_merge_summary"):
-                                    state_manager.update_state(
-                                        "merge_resolution_summary",
-                                        merge_result.get("claude_merge_summary"),
-                                    )
+                                state_manager.update_many(_merge_result_state(merge_result))
                                 if merge_result.get("merged"):
                                     persisted = True
                                     merged_to_target_branch = True
@@ -1782,9 +2029,8 @@ def run_multi_agent_session(
                         persisted = False
                         state_manager.add_to_history(f"Persistence step failed: {e}")
                         print(f"Persistence step failed: {e}")
-                    state_manager.update_state("persisted", persisted)
-                    state_manager.update_state(
-                        "stage", "complete" if persisted else "persistence_failed"
+                    state_manager.update_many(
+                        {"persisted": persisted, "stage": "complete" if persisted else "persistence_failed"}
                     )
                 if selected_workspace:
                     if approved:
@@ -1804,55 +2050,66 @@ def run_multi_agent_session(
                         current_repo_path = repo_path
 
         # Handoff summary from reviewers
-        candidates_text = ""
-        if final_selected_candidate:
-            candidates_text = _candidate_summary_text(final_selected_candidate)
-        _note("Generating handoff summaries from reviewers...")
-        handoff_prompt = _review_candidates_prompt(
-            task=task,
-            candidates_text=candidates_text or "No candidates.",
-            user_context=_format_user_context(user_qna),
-            final_handoff=True,
-        )
         reviewer_handoff: Dict[str, Dict[str, Any]] = {}
+        if approved and consensus_decisions:
+            # A consensus approval already carries each reviewer's summary of the winning
+            # candidate; a second fan-out with the same schema would only repeat it.
+            _note("Using reviewer decisions as handoff summaries...")
+            reviewer_handoff = dict(consensus_decisions)
+        else:
+            candidates_text = ""
+            if final_selected_candidate:
+                candidates_text = candidate_summaries.get(
+                    final_selected_candidate.get("id")
+                ) or _candidate_summary_text(final_selected_candidate)
+            _note("Generating handoff summaries from reviewers...")
+            handoff_prompt = _review_candidates_prompt(
+                task=task,
+                candidates_text=candidates_text or "No candidates.",
+                user_context=qna_context.render(),
+                final_handoff=True,
+            )
 
-        def _handoff_one(reviewer: AgentSpec) -> Dict[str, Any]:
-            return _run_with_agent_status(
-                reviewer,
-                phase="handoff",
-                fn=lambda: _run_reviewer_decision(
+            def _handoff_one(reviewer: AgentSpec) -> Dict[str, Any]:
+                return _run_with_agent_status(
                     reviewer,
-                    codex_clients=codex_clients,
-                    claude_clients=claude_clients,
-                    prompt=handoff_prompt,
-                    cwd=current_repo_path,
-                    decision_schema=decision_schema,
-                ),
-            )
+                    phase="handoff",
+                    fn=lambda: _run_reviewer_decision(
+                        reviewer,
+                        codex_clients=codex_clients,
+                        claude_clients=claude_clients,
+                        prompt=handoff_prompt,
+                        cwd=current_repo_path,
+                        decision_schema=decision_schema,
+                    ),
+                )
 
-        with ThreadPoolExecutor(max_workers=len(reviewers)) as pool:
-            futures = {pool.submit(_handoff_one, reviewer): reviewer for reviewer in reviewers}
-            for future in as_completed(futures):
-                reviewer = futures[future]
-                reviewer_handoff[reviewer.id] = future.result()
+            with ThreadPoolExecutor(max_workers=_reviewer_workers()) as pool:
+                futures = {pool.submit(_handoff_one, reviewer): reviewer for reviewer in reviewers}
+                for future in as_completed(futures):
+                    reviewer = futures[future]
+                    reviewer_handoff[reviewer.id] = future.result()
         _note("Handoff complete.")
 
         state_manager.update_state("handoff", reviewer_handoff)
         if telegram_client:
-            for reviewer_id, decision in reviewer_handoff.items():
+            sections = [
+                f"Reviewer {reviewer_id} summary:\n{decision.get('summary')}\n\n"
+                f"Next:\n{decision.get('next_prompt')}"
+                for reviewer_id, decision in reviewer_handoff.items()
+            ]
+            messages = _pack_telegram_sections(sections)
+            for idx, text in enumerate(messages, start=1):
+                label = "handoff_summary:all" if len(messages) == 1 else f"handoff_summary:{idx}/{len(messages)}"
                 _send_telegram_message(
                     state_manager=state_manager,
                     telegram=telegram_client,
-                    text=(
-                        f"Reviewer {reviewer_id} summary:\n{decision.get('summary')}\n\n"
-                        f"Next:\n{decision.get('next_prompt')}"
-                    ),
-                    label=f"handoff_summary:{reviewer_id}",
+                    text=text,
+                    label=label,
                 )
 
         if not approved:
-            state_manager.update_state("stage", "failed")
-            state_manager.update_state("persisted", False)
+            state_manager.update_many({"stage": "failed", "persisted": False})
         # Let the top-level runner clean up the root run workspace (not just the final candidate).
         # In session mode, we do per-session cleanup below since the top-level `finally` won't run.
         final_cleanup_workspace = None
@@ -1860,6 +2117,9 @@ def run_multi_agent_session(
         final_persisted = persisted
 
         state_manager.update_state("run_status", "stopped")
+        # Drop the run from the resume shortlist now rather than when main() exits: in session
+        # mode it idles here between tasks, and other invocations would keep re-reading it.
+        _unregister_resume_candidate(state_manager.logs_root, original_repo_path, state_manager.run_id)
         if session_mode:
             should_cleanup = (
                 cleanup_policy == "always"
@@ -1891,8 +2151,7 @@ def run_multi_agent_session(
                 )
         if not session_mode:
             break
-        state_manager.update_state("run_status", "idle")
-        state_manager.update_state("stage", "idle")
+        state_manager.update_many({"run_status": "idle", "stage": "idle"})
         _note("Run complete. Waiting for next task.")
         task = None
 
@@ -1906,36 +2165,184 @@ def run_multi_agent_session(
     }
 
 
-def _find_resume_state(*, logs_root: str, repo_path: str) -> tuple[str, dict] | None:
-    if not os.path.isdir(logs_root):
+def _normalize_repo_path(path: str) -> str:
+    """Comparable form of a repo path; stored paths are absolute, so skip abspath's getcwd()."""
+    if not os.path.isabs(path):
+        return os.path.normcase(os.path.abspath(path))
+    return _normalize_abs_repo_path(path)
+
+
+@functools.lru_cache(maxsize=256)
+def _normalize_abs_repo_path(path: str) -> str:
+    # Cached only for absolute paths, whose result doesn't depend on the working directory.
+    # Every run of a repo stores the same repo_path, so resume scans mostly hit.
+    return os.path.normcase(os.path.normpath(path))
+
+
+def _scan_resume_run(run_dir: str, run_id: str, repo_path: str) -> tuple[float, str, dict] | None:
+    """Return (mtime, run_id, state) if `run_dir` holds a running run for `repo_path` (normalized)."""
+    state_path = os.path.join(run_dir, "state.json")
+    # One stat answers both "is it a file" and "when was it written".
+    try:
+        state_stat = os.stat(state_path)
+    except OSError:
         return None
-    repo_path = os.path.abspath(repo_path)
-    candidates: list[tuple[float, str, dict]] = []
-    for run_id in os.listdir(logs_root):
-        run_dir = os.path.join(logs_root, run_id)
-        state_path = os.path.join(run_dir, "state.json")
-        if not os.path.isdir(run_dir) or not os.path.isfile(state_path):
-            continue
-        state = _read_json_file(state_path)
-        if not isinstance(state, dict):
-            continue
-        if os.path.abspath(str(state.get("repo_path", ""))) != repo_path:
-            continue
-        if state.get("run_status") != "running":
-            continue
+    if not stat.S_ISREG(state_stat.st_mode):
+        return None
+    state = _read_running_state(state_path)
+    if not isinstance(state, dict):
+        return None
+    # Runs store the absolute repo path, so an exact match usually settles it without normalizing.
+    stored_repo_path = str(state.get("repo_path", ""))
+    if stored_repo_path != repo_path and _normalize_repo_path(stored_repo_path) != repo_path:
+        return None
+    if state.get("run_status") != "running":
+        return None
+    return state_stat.st_mtime, run_id, state
+
+
+# Per-logs-root shortlist of possibly-resumable run ids per repo, so resume doesn't have to
+# open every run's state.json. Entries are only hints: each is re-verified before use.
+_RESUME_INDEX_NAME = "resume-index.json"
+
+
+def _resume_index_key(repo_path: str) -> str:
+    return hashlib.sha1(_normalize_repo_path(repo_path).encode("utf-8")).hexdigest()
+
+
+def _read_resume_index(logs_root: str) -> dict:
+    index = _read_json_file(os.path.join(logs_root, _RESUME_INDEX_NAME))
+    return index if isinstance(index, dict) else {}
+
+
+@contextlib.contextmanager
+def _locked_resume_index(logs_root: str):
+    """Hold the resume index lock (best effort) and yield the index as currently on disk."""
+    lock_f = None
+    try:
+        lock_f = open(os.path.join(logs_root, f"{_RESUME_INDEX_NAME}.lock"), "a")
+        try:
+            import fcntl
+
+            fcntl.flock(lock_f, fcntl.LOCK_EX)
+        except ImportError:
+            pass
+    except OSError:
+        pass
+    try:
+        yield _read_resume_index(logs_root)
+    finally:
+        if lock_f is not None:
+            lock_f.close()
+
+
+def _write_resume_index(logs_root: str, index: dict) -> None:
+    """Rewrite the index atomically (best effort); the caller holds the index lock."""
+    index_path = os.path.join(logs_root, _RESUME_INDEX_NAME)
+    try:
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, index_path)
+    except OSError:
+        pass
+
+
+def _update_resume_index(
+    logs_root: str, repo_path: str, update: Callable[[list], list], *, create: bool = True
+) -> None:
+    """Apply `update` to the repo's run-id list; with create=False, leave an unbuilt list alone."""
+    try:
+        os.makedirs(logs_root, exist_ok=True)
+    except OSError:
+        return
+    with _locked_resume_index(logs_root) as index:
+        key = _resume_index_key(repo_path)
+        runs = index.get(key)
+        if not isinstance(runs, list) and not create:
+            return
+        index[key] = update(list(runs) if isinstance(runs, list) else [])
+        _write_resume_index(logs_root, index)
+
+
+def _register_resume_candidate(logs_root: str, repo_path: str, run_id: str) -> None:
+    """Record a started run, but only for repos whose shortlist was already built by a scan."""
+    # A lookup that starts after this point scans the run's already-written state.json itself,
+    # so until some lookup has created the lock there is nothing to add to.
+    if not os.path.exists(os.path.join(logs_root, f"{_RESUME_INDEX_NAME}.lock")):
+        return
+    # The list check happens under the index lock, so a shortlist being built by a concurrent
+    # first scan either already includes this run or is on disk by the time we look.
+    _update_resume_index(
+        logs_root, repo_path, lambda runs: runs + [run_id] if run_id not in runs else runs, create=False
+    )
+
+
+def _unregister_resume_candidate(logs_root: str, repo_path: str, run_id: str) -> None:
+    runs = _read_resume_index(logs_root).get(_resume_index_key(repo_path))
+    if isinstance(runs, list) and run_id in runs:
+        _update_resume_index(logs_root, repo_path, lambda runs: [r for r in runs if r != run_id])
+
+
+def _scan_resume_runs(run_dirs: list[tuple[str, str]], repo_path: str) -> list[tuple[float, str, dict]]:
+    # Each run costs a stat and a read; overlap them when there are many (e.g. logs on NFS).
+    if len(run_dirs) > 8:
+        with ThreadPoolExecutor(max_workers=min(32, len(run_dirs))) as pool:
+            scanned = list(pool.map(lambda item: _scan_resume_run(*item, repo_path), run_dirs))
+    else:
+        scanned = [_scan_resume_run(*item, repo_path) for item in run_dirs]
+    return [item for item in scanned if item is not None]
+
+
+def _find_resume_state(*, logs_root: str, repo_path: str) -> tuple[str, dict] | None:
+    repo_path = _normalize_repo_path(repo_path)
+    key = _resume_index_key(repo_path)
+    indexed = _read_resume_index(logs_root).get(key)
+    if isinstance(indexed, list):
+        run_dirs = [
+            (os.path.join(logs_root, run_id), run_id)
+            for run_id in indexed
+            if isinstance(run_id, str) and run_id and not _PATH_SEPARATORS.intersection(run_id)
+        ]
+        candidates = _scan_resume_runs(run_dirs, repo_path)
+        candidate_ids = [run_id for _, run_id, _ in candidates]
+        # Drop only the finished or deleted runs this lookup checked; anything registered
+        # since it read the index stays listed.
+        dead = [run_id for run_id in indexed if run_id not in candidate_ids]
+        if dead:
+            _update_resume_index(logs_root, repo_path, lambda runs: [r for r in runs if r not in dead])
+    else:
+        # First lookup for this repo: scan every run and build its shortlist. The index lock is
+        # held throughout, so a run registering meanwhile waits and then finds the list.
+        with _locked_resume_index(logs_root) as index:
+            # A missing logs root surfaces here instead of costing an isdir() up front; d_type from
+            # the directory read answers is_dir() without a stat for non-symlink entries.
+            try:
+                with os.scandir(logs_root) as it:
+                    run_dirs = [(entry.path, entry.name) for entry in it if entry.is_dir()]
+            except OSError:
+                return None
+            candidates = _scan_resume_runs(run_dirs, repo_path)
+            runs = index.get(key)
+            runs = list(runs) if isinstance(runs, list) else []
+            index[key] = runs + [run_id for _, run_id, _ in candidates if run_id not in runs]
+            _write_resume_index(logs_root, index)
+    # Workspace checks touch the filesystem, so only run them newest-first until one survives.
+    for _, run_id, state in sorted(candidates, key=lambda item: item[0], reverse=True):
         workspace_path = state.get("workspace_path")
-        if workspace_path and not os.path.isdir(workspace_path):
+        strategy = state.get("workspace_strategy")
+        # An in-place run's workspace is the repo being resumed, which is known to exist.
+        if workspace_path and strategy != "in_place" and not os.path.isdir(workspace_path):
             continue
-        if state.get("workspace_strategy") == "copy" and workspace_path:
+        if strategy == "copy" and workspace_path:
             baseline_path = os.path.join(os.path.dirname(workspace_path), "baseline")
             if not os.path.isdir(baseline_path):
                 continue
-        mtime = os.path.getmtime(state_path)
-        candidates.append((mtime, run_id, state))
-    if not candidates:
-        return None
-    _, run_id, state = max(candidates, key=lambda item: item[0])
-    return run_id, state
+        return run_id, state
+    return None
+
+
+_PATH_SEPARATORS = frozenset(sep for sep in (os.sep, os.altsep) if sep)
 
 
 def _validate_resume_run_id(run_id: str) -> str:
@@ -1948,10 +2355,7 @@ def _validate_resume_run_id(run_id: str) -> str:
         raise RuntimeError("Invalid run id for resume.")
     if os.path.isabs(run_id):
         raise RuntimeError("Invalid run id for resume (must be a directory name).")
-    seps = [os.sep]
-    if os.altsep:
-        seps.append(os.altsep)
-    if any(sep and sep in run_id for sep in seps):
+    if not _PATH_SEPARATORS.isdisjoint(run_id):
         raise RuntimeError("Invalid run id for resume (must not contain path separators).")
     # Reject traversal-like values even if they don't contain separators (defense-in-depth).
     if ".." in run_id:
@@ -1963,21 +2367,41 @@ def _load_resume_state_by_id(*, logs_root: str, repo_path: str, run_id: str) ->
     run_id = _validate_resume_run_id(run_id)
     logs_root_abs = os.path.abspath(logs_root)
     run_dir = os.path.abspath(os.path.join(logs_root_abs, run_id))
-    if os.path.commonpath([logs_root_abs, run_dir]) != logs_root_abs:
+    if not run_dir.startswith(os.path.join(logs_root_abs, "")):
         raise RuntimeError("Invalid run id for resume.")
     state_path = os.path.join(run_dir, "state.json")
-    if not os.path.isfile(state_path):
+    try:
+        state_stat = os.stat(state_path)
+    except OSError:
+        state_stat = None
+    if state_stat is None or not stat.S_ISREG(state_stat.st_mode):
         raise RuntimeError(f"Cannot resume run {run_id}: state.json not found.")
     state = _read_json_file(state_path)
     if not isinstance(state, dict):
         raise RuntimeError(f"Cannot resume run {run_id}: invalid state.json.")
-    if os.path.abspath(str(state.get("repo_path", ""))) != os.path.abspath(repo_path):
+    if _normalize_repo_path(str(state.get("repo_path", ""))) != _normalize_repo_path(repo_path):
         raise RuntimeError("Cannot resume: run repo_path does not match current repo.")
     if state.get("run_completed") is True:
         raise RuntimeError(f"Cannot resume run {run_id}: run already completed.")
     return run_id, state
 
 
+# Resume stages that map straight to a step; "review_ready" depends on the review verdict.
+_RESUME_STAGE_STEPS = {
+    "planning": "planning",
+    "refine_plan": "planning",
+    "plan_ready": "implement",
+    "implementing": "implement",
+    "implementation_ready": "tests",
+    "testing": "tests",
+    "tests_ready": "review",
+    "reviewing": "review",
+}
+_REVIEW_STATUS_STEPS = {"APPROVED": "persist", "REJECTED": "next_iteration"}
+# Multi-agent stages reached after planning finished, so a resume can reuse the saved plans.
+_PLANS_SETTLED_STAGES = frozenset({"plan_ready", "executing", "tests_ready", "reviewing", "review_ready"})
+
+
 def _infer_resume_step(
     *,
     resume_stage: str | None,
@@ -1987,33 +2411,22 @@ def _infer_resume_step(
     test_results: dict | None,
     review: dict | None,
 ) -> str:
-    if resume_stage in ("planning", "refine_plan"):
-        return "planning"
-    if resume_stage in ("plan_ready", "implementing"):
-        return "implement"
-    if resume_stage in ("implementation_ready", "testing"):
-        return "tests"
-    if resume_stage in ("tests_ready", "reviewing"):
-        return "review"
+    # State comes from disk, so guard the lookups against non-string (unhashable) values.
+    step = _RESUME_STAGE_STEPS.get(resume_stage) if isinstance(resume_stage, str) else None
+    if step is not None:
+        return step
+    review_status = review.get("status") if isinstance(review, dict) else None
+    review_step = _REVIEW_STATUS_STEPS.get(review_status) if isinstance(review_status, str) else None
+    if review_step is not None:
+        return review_step
     if resume_stage == "review_ready":
-        if isinstance(review, dict) and review.get("status") == "REJECTED":
-            return "next_iteration"
-        if isinstance(review, dict) and review.get("status") == "APPROVED":
-            return "persist"
         return "review"
-
-    if isinstance(review, dict) and review.get("status") == "APPROVED":
-        return "persist"
-    if isinstance(review, dict) and review.get("status") == "REJECTED":
-        return "next_iteration"
     if isinstance(test_results, dict):
         return "review"
     if isinstance(claude_structured, dict) and claude_structured.get("status") == "DONE" and implementation_result:
         return "tests"
     if isinstance(plan, dict) and plan.get("status") == "OK":
         return "implement"
-    if isinstance(plan, dict) and plan.get("status") == "NEEDS_USER_INPUT":
-        return "planning"
     return "planning"
 
 
@@ -2056,17 +2469,105 @@ def _resume_workspace(
     return None
 
 
-def _format_user_context(qna: list[dict]) -> str:
-    lines: list[str] = []
+def _qna_blocks(qna: list[dict]):
     for item in qna:
         q = str(item.get("question", "")).strip()
-        a = str(item.get("answer", "")).strip()
-        if not q:
-            continue
-        lines.append(f"Q: {q}")
-        lines.append(f"A: {a}")
-        lines.append("")
-    return "\n".join(lines).strip()
+        if q:
+            yield f"Q: {q}\nA: {str(item.get('answer', '')).strip()}"
+
+
+def _format_user_context(qna: list[dict]) -> str:
+    return "\n\n".join(_qna_blocks(qna)).strip()
+
+
+_ABRIDGED_ANSWER_CHARS = 200
+
+
+class _UserContext:
+    """Rendered user Q/A context; answers are appended as they arrive instead of re-rendered.
+
+    A re-asked question keeps only its latest answer. With `max_entries`, only the newest
+    answers are rendered in full; older ones are abridged to the first line of their answer.
+    """
+
+    def __init__(self, qna: list[dict], *, max_entries: Optional[int] = None) -> None:
+        self._max_entries = max_entries
+        self._entries: Dict[str, tuple[str, str]] = {}
+        self._text = ""
+        self.add(qna)
+
+    def add(self, qna: list[dict]) -> None:
+        added: list[tuple[str, str]] = []
+        replaced = False
+        for item in qna:
+            q = str(item.get("question", "")).strip()
+            if not q:
+                continue
+            key = _question_key(q)
+            if self._entries.pop(key, None) is not None:
+                replaced = True
+            entry = (q, str(item.get("answer", "")).strip())
+            self._entries[key] = entry
+            added.append(entry)
+        if not added:
+            return
+        if replaced or (self._max_entries and len(self._entries) > self._max_entries):
+            self._text = self._render_all()
+            return
+        text = "\n\n".join(f"Q: {q}\nA: {a}" for q, a in added)
+        self._text = f"{self._text}\n\n{text}" if self._text else text
+
+    def _rendered_entries(self) -> list[tuple[str, str]]:
+        entries = list(self._entries.values())
+        if not self._max_entries or len(entries) <= self._max_entries:
+            return entries
+        older, entries = entries[: -self._max_entries], entries[-self._max_entries :]
+        abridged = []
+        for q, a in older:
+            first_line = a.split("\n", 1)[0]
+            if len(first_line) > _ABRIDGED_ANSWER_CHARS or first_line != a:
+                first_line = first_line[:_ABRIDGED_ANSWER_CHARS].rstrip() + " [...]"
+            abridged.append((q, first_line))
+        return abridged + entries
+
+    def _render_all(self) -> str:
+        return "\n\n".join(f"Q: {q}\nA: {a}" for q, a in self._rendered_entries())
+
+    def answered(self) -> list[dict]:
+        """Q/A pairs the context shows in full; a question whose answer was abridged may be asked again."""
+        return [
+            {"question": q, "answer": a}
+            for (q, a), (_, shown) in zip(self._entries.values(), self._rendered_entries())
+            if shown == a
+        ]
+
+    def render(self) -> str:
+        return self._text
+
+
+def _write_json_if_absent(path: str, payload: Dict[str, Any]) -> None:
+    """Create `path` with `payload` unless it already exists (e.g. a resumed request)."""
+    try:
+        with open(path, "x") as f:
+            json.dump(payload, f, indent=2)
+    except FileExistsError:
+        pass
+
+
+def _question_key(question: Any) -> str:
+    return " ".join(str(question).split()).casefold()
+
+
+def _unanswered_questions(questions: list[str], answered: list[dict]) -> list[str]:
+    """Drop questions (and repeats within the batch) whose normalized text already has an answer."""
+    seen = {_question_key(item.get("question", "")) for item in answered if isinstance(item, dict)}
+    pending: list[str] = []
+    for q in questions:
+        key = _question_key(q)
+        if key and key not in seen:
+            seen.add(key)
+            pending.append(str(q).strip())
+    return pending
 
 
 def _prompt_user_for_answers(
@@ -2076,12 +2577,18 @@ def _prompt_user_for_answers(
     ui_active: bool,
     poll_interval_sec: float = 0.5,
     timeout_sec: float | None = None,
+    answered: list[dict] | None = None,
 ) -> list[dict]:
-    questions_clean = [str(q).strip() for q in questions if str(q).strip()]
+    questions_clean = [text for text in (str(q).strip() for q in questions) if text]
     if not questions_clean:
         return []
+    if answered:
+        # Only ask what is still open; if the agent re-asked only answered questions, ask them
+        # again rather than looping on the same context.
+        questions_clean = _unanswered_questions(questions_clean, answered) or questions_clean
 
     existing = state_manager.get_state("awaiting_user_input")
+    awaiting_update: Dict[str, Any] = {"stage": "awaiting_user_input"}
     if isinstance(existing, dict) and existing.get("request_id"):
         request_id = str(existing.get("request_id"))
         existing_questions = existing.get("questions")
@@ -2089,24 +2596,18 @@ def _prompt_user_for_answers(
             questions_clean = [str(q).strip() for q in existing_questions if str(q).strip()]
     else:
         request_id = str(uuid.uuid4())
-        state_manager.update_state(
-            "awaiting_user_input",
-            {
-                "request_id": request_id,
-                "questions": questions_clean,
-            },
-        )
-    state_manager.update_state("stage", "awaiting_user_input")
+        awaiting_update["awaiting_user_input"] = {
+            "request_id": request_id,
+            "questions": questions_clean,
+        }
+    state_manager.update_many(awaiting_update)
 
     request_path = os.path.join(state_manager.log_dir, f"user_input_request_{request_id}.json")
     response_path = os.path.join(state_manager.log_dir, f"user_input_response_{request_id}.json")
-    if not os.path.exists(request_path):
-        with open(request_path, "w") as f:
-            json.dump({"request_id": request_id, "questions": questions_clean}, f, indent=2)
+    _write_json_if_absent(request_path, {"request_id": request_id, "questions": questions_clean})
 
     def _finalize(answers: list[dict]) -> list[dict]:
-        state_manager.update_state("awaiting_user_input", None)
-        state_manager.update_state("stage", "planning")
+        state_manager.update_many({"awaiting_user_input": None, "stage": "planning"})
         try:
             os.remove(request_path)
         except OSError:
@@ -2120,67 +2621,52 @@ def _prompt_user_for_answers(
     elif sys.stdin.isatty():
         answers: list[dict] = []
         for q in questions_clean:
-            print("")
-            print("Codex question:")
-            print(q)
+            # One write per question; a line-buffered TTY would flush each print() separately.
+            print(f"\nCodex question:\n{q}")
             ans = input("> ").strip()
             answers.append({"question": q, "answer": ans})
         return _finalize(answers)
 
     # File-based answer flow (for web UI or non-TTY execution).
-    start = time.time()
-    while True:
-        if os.path.exists(response_path):
-            try:
-                with open(response_path, "r") as f:
-                    payload = json.load(f)
-            except json.JSONDecodeError:
-                payload = None
-            if not isinstance(payload, dict):
-                time.sleep(poll_interval_sec)
-                continue
-            try:
-                os.remove(response_path)
-            except OSError:
-                pass
-
-            answers = payload.get("answers", [])
-            if not isinstance(answers, list):
-                answers = []
-            return _finalize(answers)
-
-        if timeout_sec is not None and (time.time() - start) > timeout_sec:
-            raise RuntimeError("Timed out waiting for user input.")
-
-        time.sleep(poll_interval_sec)
+    _, payload = _poll_for_response(
+        response_path,
+        state_manager=state_manager,
+        telegram=None,
+        match_telegram=None,
+        poll_interval_sec=poll_interval_sec,
+        timeout_sec=timeout_sec,
+        timeout_message="Timed out waiting for user input.",
+    )
+    answers = payload.get("answers", [])
+    if not isinstance(answers, list):
+        answers = []
+    return _finalize(answers)
 
 
 def _prompt_user_for_initial_task(
     *,
     state_manager: StateManager,
     ui_active: bool,
-    telegram: Optional[TelegramClient] = None,
+    telegram: Optional["TelegramClient"] = None,
     poll_interval_sec: float = 0.5,
     timeout_sec: float | None = None,
 ) -> str:
     existing = state_manager.get_state("awaiting_initial_task")
+    awaiting_update: Dict[str, Any] = {"stage": "awaiting_initial_task"}
     if isinstance(existing, dict) and existing.get("request_id"):
         request_id = str(existing.get("request_id"))
     else:
         request_id = str(uuid.uuid4())
-        state_manager.update_state("awaiting_initial_task", {"request_id": request_id})
-    state_manager.update_state("stage", "awaiting_initial_task")
+        awaiting_update["awaiting_initial_task"] = {"request_id": request_id}
+    state_manager.update_many(awaiting_update)
     state_manager.add_to_history(f"Awaiting initial task request_id={request_id}.")
 
     request_path = os.path.join(state_manager.log_dir, f"initial_task_request_{request_id}.json")
     response_path = os.path.join(state_manager.log_dir, f"initial_task_response_{request_id}.json")
-    if not os.path.exists(request_path):
-        with open(request_path, "w") as f:
-            json.dump({"request_id": request_id}, f, indent=2)
+    _write_json_if_absent(request_path, {"request_id": request_id})
 
     def _finalize(task_text: str) -> str:
-        state_manager.update_state("awaiting_initial_task", None)
-        state_manager.update_state("stage", "planning")
+        state_manager.update_many({"awaiting_initial_task": None, "stage": "planning"})
         try:
             os.remove(request_path)
         except OSError:
@@ -2209,57 +2695,29 @@ def _prompt_user_for_initial_task(
             label=f"initial_task_request:{request_id}",
         )
 
-    start = time.time()
-    offset = state_manager.get_state("telegram_update_offset")
-    if not isinstance(offset, int):
-        offset = None
-    while True:
-        if os.path.exists(response_path):
-            try:
-                with open(response_path, "r") as f:
-                    payload = json.load(f)
-            except json.JSONDecodeError:
-                payload = None
-            if not isinstance(payload, dict):
-                time.sleep(poll_interval_sec)
-                continue
-            try:
-                os.remove(response_path)
-            except OSError:
-                pass
-
-            task_text = str(payload.get("task", "")).strip()
-            if not task_text:
-                raise RuntimeError("Empty task provided via UI.")
-            state_manager.add_to_history("Initial task received via UI.")
-            return _finalize(task_text)
-
-        if telegram:
-            updates = telegram.poll_updates(offset)
-            for item in updates.get("result", []):
-                update_id = item.get("update_id")
-                if isinstance(update_id, int):
-                    next_offset = update_id + 1
-                    if offset is None or next_offset > offset:
-                        offset = next_offset
-                        state_manager.update_state("telegram_update_offset", offset)
-            for message in telegram.filter_messages(updates):
-                text = str(message.get("text", "")).strip()
-                if not text:
-                    continue
-                parsed = _parse_task_message(text)
-                if parsed.get("request_id") != request_id:
-                    continue
-                task_text = str(parsed.get("task", "")).strip()
-                if not task_text:
-                    continue
-                state_manager.add_to_history("Initial task received via Telegram.")
-                return _finalize(task_text)
-
-        if timeout_sec is not None and (time.time() - start) > timeout_sec:
-            raise RuntimeError("Timed out waiting for initial task.")
-
-        time.sleep(poll_interval_sec)
+    def _match_telegram(text: str) -> Optional[str]:
+        parsed = _parse_task_message(text)
+        if parsed.get("request_id") != request_id:
+            return None
+        return str(parsed.get("task", "")).strip() or None
+
+    source, result = _poll_for_response(
+        response_path,
+        state_manager=state_manager,
+        telegram=telegram,
+        match_telegram=_match_telegram,
+        poll_interval_sec=poll_interval_sec,
+        timeout_sec=timeout_sec,
+        timeout_message="Timed out waiting for initial task.",
+    )
+    if source == "telegram":
+        state_manager.add_to_history("Initial task received via Telegram.")
+        return _finalize(result)
+    task_text = str(result.get("task", "")).strip()
+    if not task_text:
+        raise RuntimeError("Empty task provided via UI.")
+    state_manager.add_to_history("Initial task received via UI.")
+    return _finalize(task_text)
 
 
 CLAUDE_STRUCTURED_SCHEMA: dict = {
@@ -2278,6 +2736,8 @@ CLAUDE_APPEND_SYSTEM_PROMPT = (
     "You are running under Luigi orchestration in non-interactive mode.\n"
     "If you need clarification, DO NOT ask the user.\n"
     "Instead, set structured_output.status=\"NEEDS_REVIEWER\" and populate structured_output.questions.\n"
+    "Ask every open question at once: list all of them in structured_output.questions in a single "
+    "NEEDS_REVIEWER response rather than one question per round.\n"
     "Back-compat: structured_output.status=\"NEEDS_CODEX\" is also accepted.\n"
     "When you have completed the requested work, set structured_output.status=\"DONE\" and provide a short summary.\n"
     "If you cannot proceed, set structured_output.status=\"FAILED\" and explain in the summary.\n"
@@ -2296,9 +2756,20 @@ def _run_git(cmd: List[str], *, cwd: str) -> subprocess.CompletedProcess:
     return subprocess.run(cmd, cwd=cwd, capture_output=True, text=True)
 
 
+def _run_git_bytes(cmd: List[str], *, cwd: str) -> subprocess.CompletedProcess:
+    """Like `_run_git`, but leaves stdout/stderr as bytes for NUL-delimited (-z) output."""
+    return subprocess.run(cmd, cwd=cwd, capture_output=True)
+
+
 def _git_error(cmd: List[str], result: subprocess.CompletedProcess) -> str:
-    stdout = (result.stdout or "").strip()
-    stderr = (result.stderr or "").strip()
+    stdout = result.stdout or ""
+    stderr = result.stderr or ""
+    if isinstance(stdout, bytes):
+        stdout = stdout.decode("utf-8", errors="replace")
+    if isinstance(stderr, bytes):
+        stderr = stderr.decode("utf-8", errors="replace")
+    stdout = stdout.strip()
+    stderr = stderr.strip()
     details = []
     if stdout:
         details.append(f"stdout: {stdout}")
@@ -2308,26 +2779,51 @@ def _git_error(cmd: List[str], result: subprocess.CompletedProcess) -> str:
     return f"Command failed: {' '.join(cmd)}{detail_text}"
 
 
-def _git_current_branch(repo_path: str) -> str:
-    result = _run_git(["git", "rev-parse", "--abbrev-ref", "HEAD"], cwd=repo_path)
+def _git_status_porcelain(repo_path: str) -> str:
+    result = _run_git(["git", "status", "--porcelain"], cwd=repo_path)
+    if result.returncode != 0:
+        raise RuntimeError(_git_error(["git", "status", "--porcelain"], result))
+    return result.stdout or ""
+
+
+def _git_status_v2(repo_path: str) -> Dict[str, Any]:
+    """Return branch, HEAD sha and dirtiness from a single `git status --porcelain=v2` call."""
+    cmd = ["git", "status", "--branch", "--porcelain=v2"]
+    result = _run_git(cmd, cwd=repo_path)
     if result.returncode != 0:
-        raise RuntimeError(_git_error(["git", "rev-parse", "--abbrev-ref", "HEAD"], result))
-    branch = (result.stdout or "").strip()
+        raise RuntimeError(_git_error(cmd, result))
+    branch = None
+    head = None
+    dirty = False
+    for line in (result.stdout or "").splitlines():
+        if line.startswith("# branch.head "):
+            branch = line[len("# branch.head "):].strip()
+        elif line.startswith("# branch.oid "):
+            head = line[len("# branch.oid "):].strip()
+        elif line and not line.startswith("#"):
+            dirty = True
+    if branch == "(detached)":
+        # Match `git rev-parse --abbrev-ref HEAD`.
+        branch = "HEAD"
     if not branch:
         raise RuntimeError("Unable to determine current git branch.")
-    return branch
+    return {"branch": branch, "head": None if head == "(initial)" else head, "dirty": dirty}
 
 
-def _git_status_porcelain(repo_path: str) -> str:
-    result = _run_git(["git", "status", "--porcelain"], cwd=repo_path)
+def _git_has_changes(repo_path: str) -> bool:
+    """True if the worktree has staged, unstaged or untracked changes."""
+    cmd = ["git", "status", "--porcelain", "-z"]
+    result = _run_git_bytes(cmd, cwd=repo_path)
     if result.returncode != 0:
-        raise RuntimeError(_git_error(["git", "status", "--porcelain"], result))
-    return result.stdout or ""
+        raise RuntimeError(_git_error(cmd, result))
+    # Any entry at all means dirty; no need to decode the listing.
+    return bool(result.stdout)
 
 
-def _git_commit_all(repo_path: str, message: str) -> Optional[str]:
-    status = _git_status_porcelain(repo_path)
-    if not status.strip():
+def _git_commit_all(repo_path: str, message: str, *, dirty: Optional[bool] = None) -> Optional[str]:
+    if dirty is None:
+        dirty = _git_has_changes(repo_path)
+    if not dirty:
         return None
     add_res = _run_git(["git", "add", "-A"], cwd=repo_path)
     if add_res.returncode != 0:
@@ -2347,16 +2843,50 @@ def _git_checkout_branch(repo_path: str, branch: str) -> None:
         raise RuntimeError(_git_error(["git", "checkout", branch], result))
 
 
-def _git_unmerged_files(repo_path: str) -> List[str]:
-    result = _run_git(["git", "diff", "--name-only", "--diff-filter=U"], cwd=repo_path)
+def _git_dir(repo_path: str) -> str:
+    """Return the git directory for `repo_path`, reading `.git` directly when possible.
+
+    Linked worktrees have a `.git` file pointing at their private git dir; anything unusual
+    falls back to asking git.
+    """
+    dot_git = os.path.join(repo_path, ".git")
+    if os.path.isdir(dot_git):
+        return dot_git
+    try:
+        with open(dot_git, "r") as f:
+            first_line = f.readline().strip()
+    except OSError:
+        first_line = ""
+    if first_line.startswith("gitdir: "):
+        return os.path.join(repo_path, first_line[len("gitdir: "):])
+    cmd = ["git", "rev-parse", "--absolute-git-dir"]
+    result = _run_git(cmd, cwd=repo_path)
     if result.returncode != 0:
-        raise RuntimeError(_git_error(["git", "diff", "--name-only", "--diff-filter=U"], result))
-    return [line.strip() for line in (result.stdout or "").splitlines() if line.strip()]
+        raise RuntimeError(_git_error(cmd, result))
+    return (result.stdout or "").strip()
+
 
+def _git_post_merge_state(repo_path: str) -> tuple[List[str], bool]:
+    """Return (unmerged files, merge in progress) from a single `git status` call.
 
-def _git_is_merge_in_progress(repo_path: str) -> bool:
-    result = _run_git(["git", "rev-parse", "-q", "--verify", "MERGE_HEAD"], cwd=repo_path)
-    return result.returncode == 0
+    Unmerged paths come from the `u` entries of `--porcelain=v2 -z`; a pending merge is
+    detected by MERGE_HEAD in the git dir rather than a second `git rev-parse`.
+    """
+    cmd = ["git", "status", "--porcelain=v2", "-z", "--untracked-files=no"]
+    result = _run_git_bytes(cmd, cwd=repo_path)
+    if result.returncode != 0:
+        raise RuntimeError(_git_error(cmd, result))
+    unmerged: List[str] = []
+    entries = iter((result.stdout or b"").split(b"\x00"))
+    for entry in entries:
+        if entry.startswith(b"u "):
+            # u <XY> <sub> <m1> <m2> <m3> <mW> <h1> <h2> <h3> <path>
+            unmerged.append(os.fsdecode(entry.split(b" ", 10)[10]))
+        elif entry.startswith(b"2 "):
+            # Renames/copies are followed by their original path as a separate field.
+            next(entries, None)
+    merge_in_progress = os.path.exists(os.path.join(_git_dir(repo_path), "MERGE_HEAD"))
+    return unmerged, merge_in_progress
 
 
 def _git_head_sha(repo_path: str) -> Optional[str]:
@@ -2375,34 +2905,43 @@ def _git_is_ancestor(repo_path: str, ancestor: str, descendant: str) -> bool:
     raise RuntimeError(_git_error(["git", "merge-base", "--is-ancestor", ancestor, descendant], result))
 
 
-def _worktree_path_for_branch(repo_path: str, branch_name: str) -> Optional[str]:
-    result = _run_git(["git", "worktree", "list", "--porcelain"], cwd=repo_path)
+def _git_merge_commit_for_branch(repo_path: str, branch_name: str) -> Optional[str]:
+    """Return HEAD's sha if HEAD is a merge commit whose second parent is `branch_name`.
+
+    Resolves HEAD, HEAD^2 and the branch in one `git rev-parse` call, which answers both
+    "is the branch merged" and "what is the merge commit" without a separate is-ancestor check.
+    """
+    result = _run_git(["git", "rev-parse", "HEAD", "HEAD^2", branch_name], cwd=repo_path)
     if result.returncode != 0:
-        raise RuntimeError(_git_error(["git", "worktree", "list", "--porcelain"], result))
-    path: Optional[str] = None
+        return None
+    shas = (result.stdout or "").split()
+    if len(shas) != 3 or shas[1] != shas[2]:
+        return None
+    return shas[0]
+
+
+def _local_branch_worktree(repo_path: str, branch_name: str) -> tuple[bool, Optional[str]]:
+    """Return (branch exists, path of the worktree that has it checked out) in one git call."""
     branch_ref = f"refs/heads/{branch_name}"
+    cmd = ["git", "for-each-ref", "--format=%(refname)%00%(worktreepath)", branch_ref]
+    result = _run_git(cmd, cwd=repo_path)
+    if result.returncode != 0:
+        raise RuntimeError(_git_error(cmd, result))
+    # for-each-ref matches by prefix, so pick out the exact ref.
     for line in (result.stdout or "").splitlines():
-        if line.startswith("worktree "):
-            path = line.split(" ", 1)[1].strip()
-            continue
-        if line.startswith("branch ") and path:
-            ref = line.split(" ", 1)[1].strip()
-            if ref == branch_ref:
-                return path
-            path = None
-    return None
+        ref, _, worktree_path = line.partition("\x00")
+        if ref == branch_ref:
+            return True, worktree_path.strip() or None
+    return False, None
 
 
 def _delete_local_branch(
     repo_path: str, branch_name: str, note_fn: Optional[Callable[[str], None]] = None
 ) -> bool:
-    ref_check = _run_git(
-        ["git", "show-ref", "--verify", "--quiet", f"refs/heads/{branch_name}"], cwd=repo_path
-    )
-    if ref_check.returncode != 0:
+    exists, in_use_path = _local_branch_worktree(repo_path, branch_name)
+    if not exists:
         return False
 
-    in_use_path = _worktree_path_for_branch(repo_path, branch_name)
     if in_use_path:
         if note_fn:
             note_fn(f"Skipping branch delete; still checked out at {in_use_path}")
@@ -2418,11 +2957,24 @@ def _delete_local_branch(
     return True
 
 
+def _head_lines(text: str, max_lines: int) -> str:
+    """Return the first `max_lines` lines of `text` without splitting the whole string."""
+    if not text or max_lines <= 0:
+        return ""
+    end = -1
+    for _ in range(max_lines):
+        end = text.find("\n", end + 1)
+        if end == -1:
+            return text
+    return text[:end]
+
+
 def _truncate_lines(text: str, max_lines: int) -> str:
-    lines = text.splitlines()
-    if len(lines) <= max_lines:
+    head = _head_lines(text, max_lines)
+    # Nothing (beyond a trailing newline) was cut off.
+    if len(head) + 1 >= len(text):
         return text
-    return "\n".join(lines[:max_lines] + ["... (truncated)"])
+    return f"{head}\n... (truncated)"
 
 
 def _format_plan_for_merge(plan: Optional[dict]) -> str:
@@ -2478,6 +3030,40 @@ def _format_candidate_for_merge(candidate: Optional[dict]) -> str:
     return "\n".join(parts)
 
 
+_MERGE_CONFLICT_PROMPT_TEMPLATE = """\
+You are resolving git merge conflicts for Luigi's orchestrator.
+Task: {task}
+Source branch: {branch_name}
+Target branch: {target_branch}
+
+Context from the approved work:
+Plan context:
+{plan_context}
+
+Reviewer context:
+{review_context}
+
+Candidate context:
+{candidate_context}
+
+Merge output:
+{merge_output}
+
+Conflicted files:
+{conflict_list}
+
+git status --porcelain:
+{status_porcelain}
+
+Instructions:
+- Resolve conflicts in the repo using the plan + review context.
+- Prefer the approved worktree branch changes unless the reviews say otherwise.
+- After resolving, stage the files with git add.
+- Complete the merge commit using: git commit -m "{merge_message}"
+- Ensure there are no unmerged paths (git diff --name-only --diff-filter=U should be empty).
+- Do not run tests unless needed for conflict resolution."""
+
+
 def _build_merge_conflict_prompt(
     *,
     task: Optional[str],
@@ -2491,52 +3077,42 @@ def _build_merge_conflict_prompt(
     candidate_context: str,
     status_porcelain: str,
 ) -> str:
-    conflict_list = "\n".join(f"- {path}" for path in conflict_files) if conflict_files else "(none)"
-    return "\n".join(
-        [
-            "You are resolving git merge conflicts for Luigi's orchestrator.",
-            f"Task: {task or '(no task provided)'}",
-            f"Source branch: {branch_name}",
-            f"Target branch: {target_branch}",
-            "",
-            "Context from the approved work:",
-            "Plan context:",
-            plan_context,
-            "",
-            "Reviewer context:",
-            review_context,
-            "",
-            "Candidate context:",
-            candidate_context,
-            "",
-            "Merge output:",
-            _truncate_lines(merge_output or "", 40),
-            "",
-            "Conflicted files:",
-            conflict_list,
-            "",
-            "git status --porcelain:",
-            _truncate_lines(status_porcelain or "", 40),
-            "",
-            "Instructions:",
-            "- Resolve conflicts in the repo using the plan + review context.",
-            "- Prefer the approved worktree branch changes unless the reviews say otherwise.",
-            "- After resolving, stage the files with git add.",
-            f"- Complete the merge commit using: git commit -m \"{merge_message}\"",
-            "- Ensure there are no unmerged paths (git diff --name-only --diff-filter=U should be empty).",
-            "- Do not run tests unless needed for conflict resolution.",
-        ]
+    return _MERGE_CONFLICT_PROMPT_TEMPLATE.format(
+        task=task or "(no task provided)",
+        branch_name=branch_name,
+        target_branch=target_branch,
+        plan_context=plan_context,
+        review_context=review_context,
+        candidate_context=candidate_context,
+        merge_output=_truncate_lines(merge_output or "", 40),
+        conflict_list="\n".join(f"- {path}" for path in conflict_files) if conflict_files else "(none)",
+        status_porcelain=_truncate_lines(status_porcelain or "", 40),
+        merge_message=merge_message,
     )
 
 
 def _pick_merge_claude_client(
     claude_clients: Dict[str, ClaudeCodeClient], preferred_id: Optional[str] = None
 ) -> Optional[ClaudeCodeClient]:
-    if preferred_id and preferred_id in claude_clients:
-        return claude_clients[preferred_id]
-    if claude_clients:
-        return next(iter(claude_clients.values()))
-    return None
+    if preferred_id:
+        client = claude_clients.get(preferred_id)
+        if client is not None:
+            return client
+    return next(iter(claude_clients.values()), None)
+
+
+def _merge_result_state(merge_result: Dict[str, Any]) -> Dict[str, Any]:
+    """State keys recorded after an auto-merge attempt, for a single `update_many`."""
+    values = {
+        "merge_status": "merged" if merge_result.get("merged") else "failed",
+        "merge_commit_sha": merge_result.get("merge_commit_sha"),
+        "dirty_main_commit_sha": merge_result.get("dirty_main_commit_sha"),
+    }
+    if merge_result.get("conflict_files"):
+        values["merge_conflict_files"] = merge_result.get("conflict_files")
+    if merge_result.get("claude_merge_summary"):
+        values["merge_resolution_summary"] = merge_result.get("claude_merge_summary")
+    return values
 
 
 def _auto_merge_worktree_branch(
@@ -2555,29 +3131,37 @@ def _auto_merge_worktree_branch(
     reviewer_decisions: Optional[dict],
     candidate: Optional[dict],
     note_fn: Optional[Callable[[str], None]] = None,
+    use_rerere: bool = True,
 ) -> Dict[str, Any]:
     def _note(msg: str) -> None:
         if note_fn:
             note_fn(msg)
 
     result: Dict[str, Any] = {"merged": False, "conflicts_resolved": False}
+    # Per-command config: record conflict resolutions and replay (and stage) them on repeat
+    # conflicts without touching the repo's own git config.
+    rerere_args = ["-c", "rerere.enabled=true", "-c", "rerere.autoUpdate=true"] if use_rerere else []
     if not branch_name:
         result["error"] = "Missing worktree branch name; cannot auto-merge."
         return result
 
-    ref_check = _run_git(
-        ["git", "show-ref", "--verify", "--quiet", f"refs/heads/{target_branch}"], cwd=repo_path
-    )
-    if ref_check.returncode != 0:
-        result["error"] = f"Target branch not found: {target_branch}"
-        return result
-
     if merge_style != "merge_commit":
         result["error"] = f"Unsupported merge_style: {merge_style}"
         return result
 
+    # Both are read-only and independent; run the status scan while the target ref is checked.
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        status_future = pool.submit(_git_status_v2, repo_path)
+        ref_check = _run_git(
+            ["git", "show-ref", "--verify", "--quiet", f"refs/heads/{target_branch}"], cwd=repo_path
+        )
+        if ref_check.returncode != 0:
+            result["error"] = f"Target branch not found: {target_branch}"
+            return result
+
     try:
-        current_branch = _git_current_branch(repo_path)
+        git_status = status_future.result()
+        current_branch = git_status["branch"]
         if current_branch != target_branch:
             _note(f"Checking out target branch: {target_branch}")
             try:
@@ -2597,8 +3181,8 @@ def _auto_merge_worktree_branch(
                 )
                 result["dirty_main_commit_sha"] = commit_sha
                 _git_checkout_branch(repo_path, target_branch)
-        status = _git_status_porcelain(repo_path)
-        if status.strip():
+            git_status = _git_status_v2(repo_path)
+        if git_status["dirty"]:
             if dirty_main_policy == "commit":
                 _note("Uncommitted changes detected on target branch; auto-committing.")
                 commit_sha = _git_commit_all(
@@ -2609,6 +3193,7 @@ def _auto_merge_worktree_branch(
                         branch=target_branch,
                         target=target_branch,
                     ),
+                    dirty=True,
                 )
                 result["dirty_main_commit_sha"] = commit_sha
             elif dirty_main_policy == "abort":
@@ -2616,20 +3201,51 @@ def _auto_merge_worktree_branch(
             else:
                 raise RuntimeError(f"Unsupported dirty_main_policy: {dirty_main_policy}")
 
-        merge_cmd = ["git", "merge", "--no-ff", "-m", merge_commit_message, branch_name]
+        merge_cmd = ["git", *rerere_args, "merge", "--no-ff", "-m", merge_commit_message, branch_name]
         _note(f"Merging {branch_name} into {target_branch}...")
         merge_res = _run_git(merge_cmd, cwd=repo_path)
         if merge_res.returncode == 0:
-            if not _git_is_ancestor(repo_path, branch_name, target_branch):
-                raise RuntimeError("Merge completed but branch is not merged into target.")
+            merge_commit_sha = _git_merge_commit_for_branch(repo_path, branch_name)
+            if merge_commit_sha is None:
+                # No merge commit was created (e.g. already up to date); verify the slow way.
+                if not _git_is_ancestor(repo_path, branch_name, target_branch):
+                    raise RuntimeError("Merge completed but branch is not merged into target.")
+                merge_commit_sha = _git_head_sha(repo_path)
+            result["merged"] = True
+            result["merge_commit_sha"] = merge_commit_sha
+            return result
+
+        def _commit_resolved_merge() -> Dict[str, Any]:
+            remaining_conflicts, merge_in_progress = _git_post_merge_state(repo_path)
+            if remaining_conflicts:
+                raise RuntimeError(f"Conflicts remain after resolution: {remaining_conflicts}")
+
+            if merge_in_progress:
+                commit_cmd = ["git", *rerere_args, "commit", "-m", merge_commit_message]
+                commit_res = _run_git(commit_cmd, cwd=repo_path)
+                if commit_res.returncode != 0:
+                    raise RuntimeError(_git_error(commit_cmd, commit_res))
+
+            merge_commit_sha = _git_merge_commit_for_branch(repo_path, branch_name)
+            if merge_commit_sha is None:
+                if not _git_is_ancestor(repo_path, branch_name, target_branch):
+                    raise RuntimeError("Branch does not appear merged after conflict resolution.")
+                merge_commit_sha = _git_head_sha(repo_path)
+
             result["merged"] = True
-            result["merge_commit_sha"] = _git_head_sha(repo_path)
+            result["conflicts_resolved"] = True
+            result["merge_commit_sha"] = merge_commit_sha
             return result
 
-        conflict_files = _git_unmerged_files(repo_path)
+        conflict_files, merge_in_progress = _git_post_merge_state(repo_path)
         result["conflict_files"] = conflict_files
         if not conflict_files:
-            raise RuntimeError(_git_error(merge_cmd, merge_res))
+            if not (use_rerere and merge_in_progress):
+                raise RuntimeError(_git_error(merge_cmd, merge_res))
+            # Every conflict matched a recorded resolution; no need to ask Claude again.
+            _note("Conflicts resolved from recorded resolutions (git rerere).")
+            result["rerere_resolved"] = True
+            return _commit_resolved_merge()
 
         if not claude_client:
             raise RuntimeError("Merge conflicts detected, but no Claude Code client is available.")
@@ -2640,7 +3256,7 @@ def _auto_merge_worktree_branch(
             branch_name=branch_name,
             target_branch=target_branch,
             merge_message=merge_commit_message,
-            merge_output="\n".join([merge_res.stdout or "", merge_res.stderr or ""]).strip(),
+            merge_output=f"{(merge_res.stdout or '').rstrip()}\n{(merge_res.stderr or '').rstrip()}".strip(),
             conflict_files=conflict_files,
             plan_context=_format_plan_for_merge(plan),
             review_context=_format_review_for_merge(reviewer_decisions),
@@ -2660,27 +3276,17 @@ def _auto_merge_worktree_branch(
         if structured.get("status") != "DONE":
             raise RuntimeError(f"Claude conflict resolution did not complete: {structured}")
 
-        remaining_conflicts = _git_unmerged_files(repo_path)
-        if remaining_conflicts:
-            raise RuntimeError(f"Conflicts remain after Claude resolution: {remaining_conflicts}")
-
-        if _git_is_merge_in_progress(repo_path):
-            commit_res = _run_git(["git", "commit", "-m", merge_commit_message], cwd=repo_path)
-            if commit_res.returncode != 0:
-                raise RuntimeError(_git_error(["git", "commit", "-m", merge_commit_message], commit_res))
-
-        if not _git_is_ancestor(repo_path, branch_name, target_branch):
-            raise RuntimeError("Branch does not appear merged after conflict resolution.")
-
-        result["merged"] = True
-        result["conflicts_resolved"] = True
-        result["merge_commit_sha"] = _git_head_sha(repo_path)
-        return result
+        return _commit_resolved_merge()
     except Exception as exc:
         result["error"] = str(exc)
         return result
 
 
+# Repo-local config file names, in precedence order.
+_LUIGI_DIR_CONFIG_NAMES = ("config.json", "config.yaml", "config.yml")
+_REPO_CONFIG_NAMES = ("luigi.config.json", "luigi.config.yaml", "luigi.config.yml")
+
+
 def resolve_config_path(config_arg: str | None, *, repo_path: str) -> str:
     """Resolve config file path.
 
@@ -2692,22 +3298,46 @@ def resolve_config_path(config_arg: str | None, *, repo_path: str) -> str:
     if config_arg:
         return config_arg
 
-    candidates = [
-        # Preferred (new name)
-        os.path.join(repo_path, ".luigi", "config.json"),
-        os.path.join(repo_path, ".luigi", "config.yaml"),
-        os.path.join(repo_path, ".luigi", "config.yml"),
-        os.path.join(repo_path, "luigi.config.json"),
-        os.path.join(repo_path, "luigi.config.yaml"),
-        os.path.join(repo_path, "luigi.config.yml"),
-    ]
-    for candidate in candidates:
-        if os.path.exists(candidate):
-            return candidate
+    # Preferred (new name) lives under .luigi/; list each directory once instead of stat-ing
+    # every candidate name.
+    for directory, names in (
+        (os.path.join(repo_path, ".luigi"), _LUIGI_DIR_CONFIG_NAMES),
+        (repo_path, _REPO_CONFIG_NAMES),
+    ):
+        present = set()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    # is_file() comes from the directory read's d_type; no extra stat.
+                    if entry.name in names and entry.is_file():
+                        present.add(entry.name)
+                        if entry.name == names[0]:
+                            # Highest precedence: no need to read the rest of a large repo root.
+                            break
+        except OSError:
+            continue
+        for name in names:
+            if name in present:
+                return os.path.join(directory, name)
 
     return os.path.join(os.path.dirname(__file__), "config.yaml")
 
 
+def _existing_dir(path: str) -> str:
+    """argparse `type=` for --repo: an existing directory, returned absolute."""
+    path = os.path.abspath(path)
+    if not os.path.isdir(path):
+        raise argparse.ArgumentTypeError(f"not a directory: {path}")
+    return path
+
+
+def _existing_file(path: str) -> str:
+    """argparse `type=` for --config: an existing file (path kept as given)."""
+    if not os.path.isfile(path):
+        raise argparse.ArgumentTypeError(f"no such file: {path}")
+    return path
+
+
 def main():
     """Main function to run the orchestration loop."""
     parser = argparse.ArgumentParser(description="Luigi: Codex + Claude Code automated coding orchestrator")
@@ -2717,7 +3347,9 @@ def main():
         default=None,
         help='Task prompt, or a repo path (e.g. "." to start UI-first mode).',
     )
-    parser.add_argument("--repo", type=str, default=None, help="Path to the target repository/workspace.")
+    parser.add_argument(
+        "--repo", type=_existing_dir, default=None, help="Path to the target repository/workspace."
+    )
     parser.add_argument(
         "--resume-run-id",
         type=str,
@@ -2726,7 +3358,7 @@ def main():
     )
     parser.add_argument(
         "--config",
-        type=str,
+        type=_existing_file,
         default=None,
         help="Path to config file (JSON or YAML). If omitted, uses repo-local config or built-in defaults.",
     )
@@ -2738,7 +3370,7 @@ def main():
     # - `luigi .` or `luigi /path/to/repo` → UI-first mode, collect initial task in web UI
     task: str | None = None
     if args.repo:
-        repo_path = os.path.abspath(args.repo)
+        repo_path = args.repo
         task = args.task_or_repo
     else:
         candidate = args.task_or_repo
@@ -2755,13 +3387,15 @@ def main():
         raise SystemExit("Cannot combine --resume-run-id with an explicit task prompt.")
 
     config_path = resolve_config_path(args.config, repo_path=repo_path)
+    config_abspath = os.path.abspath(config_path)
     config = load_config(config_path)
+    orch_cfg = config.get("orchestrator") or {}
 
     logs_root = _normalize_path(
-        config.get("orchestrator", {}).get("logs_dir", "~/.luigi/logs"),
+        orch_cfg.get("logs_dir", "~/.luigi/logs"),
         repo_path=repo_path,
     )
-    resume_on_start = bool(config.get("orchestrator", {}).get("resume_on_start", True))
+    resume_on_start = bool(orch_cfg.get("resume_on_start", True))
     resume_info = None
     if args.resume_run_id:
         resume_info = _load_resume_state_by_id(
@@ -2771,30 +3405,40 @@ def main():
         )
     elif resume_on_start and task is None:
         resume_info = _find_resume_state(logs_root=logs_root, repo_path=repo_path)
+    state_flush_debounce_ms = _optional_positive_int(orch_cfg.get("state_flush_debounce_ms", 50), default=50) or 0
     if resume_info:
         resume_run_id, _ = resume_info
-        state_manager = StateManager(logs_root=logs_root, run_id=resume_run_id, load_existing=True)
+        state_manager = StateManager(
+            logs_root=logs_root,
+            run_id=resume_run_id,
+            load_existing=True,
+            flush_debounce_ms=state_flush_debounce_ms,
+        )
     else:
-        state_manager = StateManager(logs_root=logs_root)
+        state_manager = StateManager(logs_root=logs_root, flush_debounce_ms=state_flush_debounce_ms)
 
-    codex_cfg = dict(config["codex"])
-    codex_cfg["log_dir"] = state_manager.log_dir
-    claude_cfg = dict(config["claude_code"])
-    claude_cfg["log_dir"] = state_manager.log_dir
+    # The clients only read their config, so overlay log_dir instead of copying the sections.
+    codex_cfg = ChainMap({"log_dir": state_manager.log_dir}, config["codex"])
+    claude_cfg = ChainMap({"log_dir": state_manager.log_dir}, config["claude_code"])
     codex_client = CodexClient(codex_cfg)
     claude_code_client = ClaudeCodeClient(claude_cfg)
 
-    telegram_cfg = config.get("telegram", {}) if isinstance(config, dict) else {}
+    telegram_cfg = config.get("telegram") or {}
     telegram_client = None
     if telegram_cfg.get("enabled"):
+        # Ints pass through as-is; only string IDs need the digit check and conversion.
         allowed_user_ids = [
-            int(x) for x in telegram_cfg.get("allowed_user_ids", []) if str(x).isdigit()
+            x if type(x) is int else int(x)
+            for x in telegram_cfg.get("allowed_user_ids", [])
+            if (type(x) is int and x >= 0) or (isinstance(x, str) and x.isdigit())
         ]
         if not allowed_user_ids:
             print(
                 "Warning: Telegram is enabled with empty allowed_user_ids. "
                 "Any user in the configured chat can respond."
             )
+        from telegram_client import TelegramClient
+
         telegram_client = TelegramClient(
             bot_token=str(telegram_cfg.get("bot_token") or ""),
             chat_id=str(telegram_cfg.get("chat_id") or ""),
@@ -2807,9 +3451,9 @@ def main():
     executors = agents["executors"]
     assignment = assignment_config(config)
     resuming = resume_info is not None
-    session_mode = bool(config.get("orchestrator", {}).get("session_mode", False))
+    session_mode = bool(orch_cfg.get("session_mode", False))
     multi_agent_enabled = len(reviewers) > 1 or len(executors) > 1 or bool(
-        config.get("orchestrator", {}).get("multi_agent")
+        orch_cfg.get("multi_agent")
     )
     stored_mode = state_manager.state.get("orchestrator_mode") if resuming else None
     if stored_mode in ("single", "multi"):
@@ -2819,31 +3463,32 @@ def main():
         multi_agent_enabled = True
     if resuming:
         state_manager.add_to_history("Resuming previous run.")
-    # Persist core run metadata early for monitoring.
-    state_manager.update_state("run_id", state_manager.run_id)
-    state_manager.update_state("repo_path", repo_path)
-    state_manager.update_state("config_path", os.path.abspath(config_path))
-    state_manager.update_state("run_status", "running")
-    state_manager.update_state(
-        "agents",
-        {
-            "reviewers": [{"id": r.id, "kind": r.kind} for r in reviewers],
-            "executors": [{"id": e.id, "kind": e.kind} for e in executors],
-        },
-    )
-    state_manager.update_state("codex_status", "Stopped")
-    state_manager.update_state("claude_status", "Stopped")
-    state_manager.update_state("codex_phase", "idle")
-    state_manager.update_state("claude_phase", "idle")
-    state_manager.update_state("codex_log_path", os.path.join(state_manager.log_dir, "codex.log"))
-    state_manager.update_state("claude_log_path", os.path.join(state_manager.log_dir, "claude.log"))
-    state_manager.update_state("orchestrator_mode", "multi" if multi_agent_enabled else "single")
-
     invocation_dir = os.getcwd()
     project_id = compute_project_id(invocation_dir)
-    state_manager.update_state("project_id", project_id)
+    # Persist core run metadata early for monitoring (one write).
+    state_manager.update_many(
+        {
+            "run_id": state_manager.run_id,
+            "repo_path": repo_path,
+            "config_path": config_abspath,
+            "run_status": "running",
+            "agents": {
+                "reviewers": [{"id": r.id, "kind": r.kind} for r in reviewers],
+                "executors": [{"id": e.id, "kind": e.kind} for e in executors],
+            },
+            "codex_status": "Stopped",
+            "claude_status": "Stopped",
+            "codex_phase": "idle",
+            "claude_phase": "idle",
+            "codex_log_path": codex_client.log_path,
+            "claude_log_path": claude_code_client.log_path,
+            "orchestrator_mode": "multi" if multi_agent_enabled else "single",
+            "project_id": project_id,
+        }
+    )
+    _register_resume_candidate(logs_root, repo_path, state_manager.run_id)
 
-    ui_cfg = config.get("orchestrator", {}).get("ui", {})
+    ui_cfg = orch_cfg.get("ui") or {}
     ui_enabled = bool(ui_cfg.get("enabled", True)) or task is None
     ui_host = str(ui_cfg.get("host", "127.0.0.1"))
     ui_base_port = int(ui_cfg.get("base_port", 8501))
@@ -2855,7 +3500,11 @@ def main():
     if user_input_timeout_sec is not None:
         user_input_timeout_sec = float(user_input_timeout_sec)
 
-    ui = start_streamlit_ui(
+    # Launching Streamlit includes port probing and a startup grace sleep; overlap it with
+    # workspace setup (which may run `git worktree add`) and collect it before the UI is needed.
+    ui_executor = ThreadPoolExecutor(max_workers=1)
+    ui_future = ui_executor.submit(
+        start_streamlit_ui,
         log_dir=state_manager.log_dir,
         run_id=state_manager.run_id,
         repo_path=repo_path,
@@ -2866,33 +3515,14 @@ def main():
         port_range=ui_port_range,
         open_browser=ui_open_browser,
     )
-    if ui:
-        state_manager.update_state(
-            "ui",
-            {
-                "enabled": True,
-                "url": ui.url,
-                "port": ui.port,
-                "host": ui.host,
-                "log_path": ui.log_path,
-                "project_id": ui.project_id,
-            },
-        )
-    else:
-        state_manager.update_state(
-            "ui",
-            {
-                "enabled": False,
-                "project_id": project_id,
-            },
-        )
+    ui_executor.shutdown(wait=False)
 
     workspace_base_dir = _normalize_path(
-        config.get("orchestrator", {}).get("working_dir", "~/.luigi/workspaces"),
+        orch_cfg.get("working_dir", "~/.luigi/workspaces"),
         repo_path=repo_path,
     )
-    workspace_strategy = config.get("orchestrator", {}).get("workspace_strategy", "in_place")
-    use_git_worktree = config.get("orchestrator", {}).get("use_git_worktree", True)
+    workspace_strategy = orch_cfg.get("workspace_strategy", "in_place")
+    use_git_worktree = orch_cfg.get("use_git_worktree", True)
     workspace_manager = WorkspaceManager(workspace_base_dir)
 
     resume_state = state_manager.state if resuming else {}
@@ -2907,43 +3537,37 @@ def main():
     implementation_result = resume_state.get("implementation_result") if resuming else ""
     test_results = resume_state.get("test_results") if resuming else None
     persisted = bool(resume_state.get("persisted")) if resuming else False
-    user_qna = resume_state.get("user_qna") if resuming else state_manager.get_state("user_qna")
-    if user_qna is None:
-        user_qna = []
-    if not isinstance(user_qna, list):
-        user_qna = []
-
-    cleanup_policy = config.get("orchestrator", {}).get("cleanup", "on_success")  # always | on_success | never
-    apply_changes_on_success = config.get("orchestrator", {}).get("apply_changes_on_success", True)
-    commit_on_approval = config.get("orchestrator", {}).get("commit_on_approval", True)
-    commit_message_template = config.get("orchestrator", {}).get("commit_message", "Task complete: {task}")
-    auto_merge_on_approval = bool(config.get("orchestrator", {}).get("auto_merge_on_approval", False))
-    merge_target_branch = config.get("orchestrator", {}).get("merge_target_branch", "main")
-    merge_style = config.get("orchestrator", {}).get("merge_style", "merge_commit")
-    branch_prefix = config.get("orchestrator", {}).get("branch_prefix", "luigi")
+    # A resumed run's state_manager reads that run's directory, so its journal is the one loaded.
+    user_qna = state_manager.load_user_qna()
+    user_context_max_entries = _optional_positive_int(orch_cfg.get("user_context_max_entries"), default=None)
+    qna_context = _UserContext(user_qna, max_entries=user_context_max_entries)
+
+    cleanup_policy = orch_cfg.get("cleanup", "on_success")  # always | on_success | never
+    apply_changes_on_success = orch_cfg.get("apply_changes_on_success", True)
+    commit_on_approval = orch_cfg.get("commit_on_approval", True)
+    commit_message_template = orch_cfg.get("commit_message", "Task complete: {task}")
+    auto_merge_on_approval = bool(orch_cfg.get("auto_merge_on_approval", False))
+    merge_target_branch = orch_cfg.get("merge_target_branch", "main")
+    merge_style = orch_cfg.get("merge_style", "merge_commit")
+    merge_use_rerere = bool(orch_cfg.get("merge_use_rerere", True))
+    branch_prefix = orch_cfg.get("branch_prefix", "luigi")
     branch_name_length = _optional_positive_int(
-        config.get("orchestrator", {}).get("branch_name_length", 8),
+        orch_cfg.get("branch_name_length", 8),
         default=8,
     ) or 8
-    dirty_main_policy = config.get("orchestrator", {}).get("dirty_main_policy", "commit")
-    dirty_main_commit_message_template = config.get(
-        "orchestrator",
-        {},
-    ).get(
+    dirty_main_policy = orch_cfg.get("dirty_main_policy", "commit")
+    dirty_main_commit_message_template = orch_cfg.get(
         "dirty_main_commit_message",
         "Auto-commit local changes before Luigi merge (run {run_id})",
     )
-    merge_commit_message_template = config.get(
-        "orchestrator",
-        {},
-    ).get(
+    merge_commit_message_template = orch_cfg.get(
         "merge_commit_message",
         "Merge {branch} into {target} (run {run_id})",
     )
-    delete_branch_on_merge = bool(config.get("orchestrator", {}).get("delete_branch_on_merge", True))
-    delete_worktree_on_merge = bool(config.get("orchestrator", {}).get("delete_worktree_on_merge", True))
+    delete_branch_on_merge = bool(orch_cfg.get("delete_branch_on_merge", True))
+    delete_worktree_on_merge = bool(orch_cfg.get("delete_worktree_on_merge", True))
     max_claude_question_rounds = _optional_positive_int(
-        config.get("orchestrator", {}).get("max_claude_question_rounds", 5),
+        orch_cfg.get("max_claude_question_rounds", 5),
         default=5,
     )
 
@@ -2952,31 +3576,28 @@ def main():
     if resuming:
         resume_step = _infer_resume_step(
             resume_stage=resume_stage if isinstance(resume_stage, str) else None,
-            plan=plan if isinstance(plan, dict) else None,
-            claude_structured=resume_state.get("claude_structured_output")
-            if isinstance(resume_state.get("claude_structured_output"), dict)
-            else None,
+            plan=_dict_or_none(plan),
+            claude_structured=_dict_or_none(resume_state.get("claude_structured_output")),
             implementation_result=implementation_result,
-            test_results=test_results if isinstance(test_results, dict) else None,
-            review=review if isinstance(review, dict) else None,
+            test_results=_dict_or_none(test_results),
+            review=_dict_or_none(review),
         )
 
     if resuming and resume_step in ("planning", "implement", "tests", "review"):
         iteration = max(iteration - 1, 0)
+    resume_update: Dict[str, Any] = {}
     if resuming and resume_step == "persist":
         approved = True
-        state_manager.update_state("approved", True)
+        resume_update["approved"] = True
     if resuming and resume_step:
-        state_manager.update_state("resume_step", resume_step)
+        resume_update["resume_step"] = resume_step
+    if resume_update:
+        state_manager.update_many(resume_update)
 
     print(f"Run ID: {state_manager.run_id}")
     print(f"Repo:   {repo_path}")
-    print(f"Config: {os.path.abspath(config_path)}")
+    print(f"Config: {config_abspath}")
     print(f"Logs:   {state_manager.log_dir}")
-    if ui:
-        print(f"UI:     {ui.url} (project: {ui.project_id})")
-    elif ui_enabled:
-        print("UI:     (disabled) Install Python deps with: python3 -m pip install -r requirements.txt")
 
     workspace = None
     if resuming:
@@ -2997,10 +3618,26 @@ def main():
             branch_prefix=branch_prefix,
             branch_name_length=branch_name_length,
         )
-    state_manager.update_state("workspace_path", workspace.path)
-    state_manager.update_state("workspace_strategy", workspace.strategy)
+    startup_state = {"workspace_path": workspace.path, "workspace_strategy": workspace.strategy}
     if workspace.branch_name:
-        state_manager.update_state("workspace_branch", workspace.branch_name)
+        startup_state["workspace_branch"] = workspace.branch_name
+    ui = ui_future.result()
+    if ui:
+        startup_state["ui"] = {
+            "enabled": True,
+            "url": ui.url,
+            "port": ui.port,
+            "host": ui.host,
+            "log_path": ui.log_path,
+            "project_id": ui.project_id,
+        }
+    else:
+        startup_state["ui"] = {"enabled": False, "project_id": project_id}
+    state_manager.update_many(startup_state)
+    if ui:
+        print(f"UI:     {ui.url} (project: {ui.project_id})")
+    elif ui_enabled:
+        print("UI:     (disabled) Install Python deps with: python3 -m pip install -r requirements.txt")
     print(f"Workspace: {workspace.path} ({workspace.strategy})")
 
     cleanup_workspace = workspace
@@ -3009,23 +3646,57 @@ def main():
     merge_branch_to_delete = None
     delete_branch_on_merge = False
 
-    def _with_codex_status(phase: str, fn):
-        state_manager.update_state("codex_status", "Running")
-        state_manager.update_state("codex_phase", phase)
+    def _with_codex_status(phase: str, fn, *args, **kwargs):
+        state_manager.update_many({"codex_status": "Running", "codex_phase": phase})
         try:
-            return fn()
+            return fn(*args, **kwargs)
         finally:
-            state_manager.update_state("codex_status", "Stopped")
-            state_manager.update_state("codex_phase", "idle")
+            state_manager.update_many({"codex_status": "Stopped", "codex_phase": "idle"})
 
-    def _with_claude_status(phase: str, fn):
-        state_manager.update_state("claude_status", "Running")
-        state_manager.update_state("claude_phase", phase)
+    def _with_claude_status(phase: str, fn, *args, **kwargs):
+        state_manager.update_many({"claude_status": "Running", "claude_phase": phase})
         try:
-            return fn()
+            return fn(*args, **kwargs)
         finally:
-            state_manager.update_state("claude_status", "Stopped")
-            state_manager.update_state("claude_phase", "idle")
+            state_manager.update_many({"claude_status": "Stopped", "claude_phase": "idle"})
+
+    def _single_agent_handoff(diff_preview: str) -> None:
+        """Ask the reviewer for the final handoff summary (single-agent path)."""
+        try:
+            candidate = {
+                "id": "single",
+                "reviewer_id": "reviewer-1",
+                "executor_id": "executor-1",
+                "status": "APPROVED" if approved else "REJECTED",
+                "test_summary": _summarize_test_results(test_results),
+                "executor_summary": implementation_result,
+                "diff_preview": diff_preview,
+            }
+            candidates_text = _candidate_summary_text(candidate)
+            handoff_prompt = _review_candidates_prompt(
+                task=task or "",
+                candidates_text=candidates_text,
+                user_context=qna_context.render(),
+                final_handoff=True,
+            )
+            handoff = codex_client.run_structured(
+                prompt=handoff_prompt,
+                schema_path=_reviewer_decision_schema_path(),
+                cwd=workspace.path,
+            )
+            state_manager.update_state("handoff", {"reviewer-1": handoff})
+            if telegram_client:
+                _send_telegram_message(
+                    state_manager=state_manager,
+                    telegram=telegram_client,
+                    text=(
+                        f"Reviewer summary:\n{handoff.get('summary')}\n\n"
+                        f"Next:\n{handoff.get('next_prompt')}"
+                    ),
+                    label="handoff_summary:single",
+                )
+        except Exception as e:
+            state_manager.add_to_history(f"Handoff summary failed: {e}")
 
     try:
         if multi_agent_enabled:
@@ -3063,8 +3734,9 @@ def main():
                 state_manager.update_state("task", task)
 
             resume_used = False
+            question_round = 0
             max_iterations = _optional_positive_int(
-                config.get("orchestrator", {}).get("max_iterations", 5),
+                orch_cfg.get("max_iterations", 5),
                 default=5,
             )
             while not approved:
@@ -3113,7 +3785,7 @@ def main():
                     admin_choice = _await_admin_decision(
                         state_manager=state_manager,
                         options=options,
-                        ui_active=ui_active,
+                        ui_active=ui is not None and ui.is_running(),
                         telegram=telegram_client,
                         poll_interval_sec=user_input_poll_interval_sec,
                         timeout_sec=user_input_timeout_sec,
@@ -3130,10 +3802,14 @@ def main():
                     state_manager.add_to_history(
                         "Admin accepted partial result after reaching max iterations."
                     )
-                    state_manager.update_state("max_iterations_missing_summary", missing_summary)
-                    state_manager.update_state("approved_by_admin", True)
                     approved = True
-                    state_manager.update_state("approved", True)
+                    state_manager.update_many(
+                        {
+                            "max_iterations_missing_summary": missing_summary,
+                            "approved_by_admin": True,
+                            "approved": True,
+                        }
+                    )
                     break
 
                 iteration = next_iteration
@@ -3158,20 +3834,17 @@ def main():
                     while True:
                         if skip_plan and isinstance(plan, dict) and plan.get("status") != "NEEDS_USER_INPUT":
                             print("Resuming from existing plan.")
-                            state_manager.update_state("plan", plan)
-                            state_manager.update_state("stage", "plan_ready")
+                            state_manager.update_many({"plan": plan, "stage": "plan_ready"})
                             break
                         state_manager.update_state("stage", "planning")
                         plan = _with_codex_status(
                             "plan",
-                            lambda: codex_client.create_plan(
-                                task,
-                                user_context=_format_user_context(user_qna),
-                                cwd=workspace.path,
-                            ),
+                            codex_client.create_plan,
+                            task,
+                            user_context=qna_context.render(),
+                            cwd=workspace.path,
                         )
-                        state_manager.update_state("plan", plan)
-                        state_manager.update_state("stage", "plan_ready")
+                        state_manager.update_many({"plan": plan, "stage": "plan_ready"})
 
                         if plan.get("status") != "NEEDS_USER_INPUT":
                             break
@@ -3181,35 +3854,34 @@ def main():
                             raise RuntimeError("Codex returned NEEDS_USER_INPUT without questions.")
 
                         new_qna = _prompt_user_for_answers(
-                            [str(q) for q in questions],
+                            questions,
                             state_manager=state_manager,
+                            answered=qna_context.answered(),
                             ui_active=ui is not None and ui.is_running(),
                             poll_interval_sec=user_input_poll_interval_sec,
                             timeout_sec=user_input_timeout_sec,
                         )
                         user_qna.extend(new_qna)
-                        state_manager.update_state("user_qna", user_qna)
+                        qna_context.add(new_qna)
+                        state_manager.add_user_qna(new_qna)
                 else:
                     print("Codex is refining the plan based on feedback...")
                     while True:
                         if skip_plan and isinstance(plan, dict) and plan.get("status") != "NEEDS_USER_INPUT":
                             print("Resuming from existing plan.")
-                            state_manager.update_state("plan", plan)
-                            state_manager.update_state("stage", "plan_ready")
+                            state_manager.update_many({"plan": plan, "stage": "plan_ready"})
                             break
                         state_manager.update_state("stage", "refine_plan")
                         plan = _with_codex_status(
                             "refine_plan",
-                            lambda: codex_client.refine_plan(
-                                state_manager.get_state("plan"),
-                                state_manager.get_state("review")
-                                or {"status": "REJECTED", "feedback": state_manager.get_state("feedback") or ""},
-                                user_context=_format_user_context(user_qna),
-                                cwd=workspace.path,
-                            ),
+                            codex_client.refine_plan,
+                            state_manager.get_state("plan"),
+                            state_manager.get_state("review")
+                            or {"status": "REJECTED", "feedback": state_manager.get_state("feedback") or ""},
+                            user_context=qna_context.render(),
+                            cwd=workspace.path,
                         )
-                        state_manager.update_state("plan", plan)
-                        state_manager.update_state("stage", "plan_ready")
+                        state_manager.update_many({"plan": plan, "stage": "plan_ready"})
 
                         if plan.get("status") != "NEEDS_USER_INPUT":
                             break
@@ -3219,14 +3891,16 @@ def main():
                             raise RuntimeError("Codex returned NEEDS_USER_INPUT without questions.")
 
                         new_qna = _prompt_user_for_answers(
-                            [str(q) for q in questions],
+                            questions,
                             state_manager=state_manager,
+                            answered=qna_context.answered(),
                             ui_active=ui is not None and ui.is_running(),
                             poll_interval_sec=user_input_poll_interval_sec,
                             timeout_sec=user_input_timeout_sec,
                         )
                         user_qna.extend(new_qna)
-                        state_manager.update_state("user_qna", user_qna)
+                        qna_context.add(new_qna)
+                        state_manager.add_user_qna(new_qna)
 
                 print("Plan created/refined.")
 
@@ -3243,13 +3917,12 @@ def main():
                     state_manager.update_state("stage", "implementing")
                     implementation_output = _with_claude_status(
                         "implement",
-                        lambda: claude_code_client.implement(
-                            plan,
-                            session_id=claude_session_id,
-                            cwd=workspace.path,
-                            json_schema=CLAUDE_STRUCTURED_SCHEMA,
-                            append_system_prompt=CLAUDE_APPEND_SYSTEM_PROMPT,
-                        ),
+                        claude_code_client.implement,
+                        plan,
+                        session_id=claude_session_id,
+                        cwd=workspace.path,
+                        json_schema=CLAUDE_STRUCTURED_SCHEMA,
+                        append_system_prompt=CLAUDE_APPEND_SYSTEM_PROMPT,
                     )
 
                 if not implementation_output:
@@ -3259,10 +3932,14 @@ def main():
                 claude_session_id = implementation_output.get("session_id")
                 claude_step = _get_claude_structured(implementation_output)
                 implementation_result = implementation_output.get("result", "")
-                state_manager.update_state("implementation_result", implementation_result)
-                state_manager.update_state("claude_session_id", claude_session_id)
-                state_manager.update_state("claude_structured_output", claude_step)
-                state_manager.update_state("stage", "implementation_ready")
+                state_manager.update_many(
+                    {
+                        "implementation_result": implementation_result,
+                        "claude_session_id": claude_session_id,
+                        "claude_structured_output": claude_step,
+                        "stage": "implementation_ready",
+                    }
+                )
 
                 # 2.25 Executor -> Reviewer: if the executor needs clarification, ask a reviewer (Codex).
                 question_round = 0
@@ -3282,15 +3959,15 @@ def main():
                     )
 
                     # Reviewer answers the executor; if the reviewer needs more info, ask the user.
+                    executor_questions = [str(q) for q in questions]
                     while True:
                         reviewer_answer = _with_codex_status(
                             "answer_executor",
-                            lambda: codex_client.answer_executor(
-                                questions=[str(q) for q in questions],
-                                context={"task": task, "plan": plan},
-                                user_context=_format_user_context(user_qna),
-                                cwd=workspace.path,
-                            ),
+                            codex_client.answer_executor,
+                            questions=executor_questions,
+                            context={"task": task, "plan": plan},
+                            user_context=qna_context.render(),
+                            cwd=workspace.path,
                         )
                         state_manager.update_state("reviewer_answer_to_executor", reviewer_answer)
 
@@ -3304,14 +3981,16 @@ def main():
                             )
 
                         new_qna = _prompt_user_for_answers(
-                            [str(q) for q in user_questions],
+                            user_questions,
                             state_manager=state_manager,
+                            answered=qna_context.answered(),
                             ui_active=ui is not None and ui.is_running(),
                             poll_interval_sec=user_input_poll_interval_sec,
                             timeout_sec=user_input_timeout_sec,
                         )
                         user_qna.extend(new_qna)
-                        state_manager.update_state("user_qna", user_qna)
+                        qna_context.add(new_qna)
+                        state_manager.add_user_qna(new_qna)
 
                     if reviewer_answer.get("status") != "ANSWER":
                         raise RuntimeError("Reviewer did not return an ANSWER for the executor.")
@@ -3326,13 +4005,12 @@ def main():
                     )
                     implementation_output = _with_claude_status(
                         "implement_followup",
-                        lambda: claude_code_client.implement(
-                            followup,
-                            session_id=claude_session_id,
-                            cwd=workspace.path,
-                            json_schema=CLAUDE_STRUCTURED_SCHEMA,
-                            append_system_prompt=CLAUDE_APPEND_SYSTEM_PROMPT,
-                        ),
+                        claude_code_client.implement,
+                        followup,
+                        session_id=claude_session_id,
+                        cwd=workspace.path,
+                        json_schema=CLAUDE_STRUCTURED_SCHEMA,
+                        append_system_prompt=CLAUDE_APPEND_SYSTEM_PROMPT,
                     )
                     if not implementation_output:
                         raise RuntimeError("Claude Code follow-up failed after Codex answered questions.")
@@ -3340,10 +4018,14 @@ def main():
                     claude_session_id = implementation_output.get("session_id") or claude_session_id
                     claude_step = _get_claude_structured(implementation_output)
                     implementation_result = implementation_output.get("result", "")
-                    state_manager.update_state("implementation_result", implementation_result)
-                    state_manager.update_state("claude_session_id", claude_session_id)
-                    state_manager.update_state("claude_structured_output", claude_step)
-                    state_manager.update_state("stage", "implementation_ready")
+                    state_manager.update_many(
+                        {
+                            "implementation_result": implementation_result,
+                            "claude_session_id": claude_session_id,
+                            "claude_structured_output": claude_step,
+                            "stage": "implementation_ready",
+                        }
+                    )
 
                 if claude_step.get("status") == "FAILED":
                     print("Claude reported FAILED; aborting.")
@@ -3367,32 +4049,31 @@ def main():
                     state_manager.update_state("stage", "testing")
                     plan_test_commands = plan.get("test_commands") if isinstance(plan, dict) else None
                     test_results = run_tests(cwd=workspace.path, config=config, test_commands=plan_test_commands)
-                    state_manager.update_state("test_results", test_results)
-                    state_manager.update_state("stage", "tests_ready")
+                    state_manager.update_many({"test_results": test_results, "stage": "tests_ready"})
 
                 # 3. Review
                 print("Codex is reviewing the implementation...")
-                diff = workspace.get_diff()
+                # The diff only changes when Claude edits (or the tests add files), so key it on the
+                # implementation attempt: NEEDS_USER_INPUT rounds and the handoff reuse it.
+                diff_token = (iteration, question_round)
                 while True:
                     if skip_review and isinstance(review, dict):
                         print("Resuming from existing review.")
-                        state_manager.update_state("review", review)
-                        state_manager.update_state("stage", "review_ready")
+                        state_manager.update_many({"review": review, "stage": "review_ready"})
                         break
+                    diff = workspace.get_diff(cache_token=diff_token)
                     state_manager.update_state("stage", "reviewing")
                     review = _with_codex_status(
                         "review",
-                        lambda: codex_client.review(
-                            plan,
-                            implementation_result,
-                            diff=diff,
-                            test_results=test_results,
-                            user_context=_format_user_context(user_qna),
-                            cwd=workspace.path,
-                        ),
+                        codex_client.review,
+                        plan,
+                        implementation_result,
+                        diff=diff,
+                        test_results=test_results,
+                        user_context=qna_context.render(),
+                        cwd=workspace.path,
                     )
-                    state_manager.update_state("review", review)
-                    state_manager.update_state("stage", "review_ready")
+                    state_manager.update_many({"review": review, "stage": "review_ready"})
 
                     if review.get("status") != "NEEDS_USER_INPUT":
                         break
@@ -3402,14 +4083,16 @@ def main():
                         raise RuntimeError("Codex returned NEEDS_USER_INPUT without questions.")
 
                     new_qna = _prompt_user_for_answers(
-                        [str(q) for q in questions],
+                        questions,
                         state_manager=state_manager,
+                        answered=qna_context.answered(),
                         ui_active=ui is not None and ui.is_running(),
                         poll_interval_sec=user_input_poll_interval_sec,
                         timeout_sec=user_input_timeout_sec,
                     )
                     user_qna.extend(new_qna)
-                    state_manager.update_state("user_qna", user_qna)
+                    qna_context.add(new_qna)
+                    state_manager.add_user_qna(new_qna)
 
                 if review.get("status") == "APPROVED":
                     approved = True
@@ -3420,11 +4103,17 @@ def main():
                     feedback = review.get("feedback", "No feedback provided.")
                     print(f"Implementation REJECTED. Feedback: {feedback}")
                     state_manager.add_to_history(f"Implementation rejected. Feedback: {feedback}")
-                    state_manager.update_state("feedback", feedback)
-                    state_manager.update_state("approved", False)
+                    state_manager.update_many({"feedback": feedback, "approved": False})
 
                 resume_used = True
 
+        # The handoff summary runs after persistence (its Codex call shares the workspace with
+        # the commit/merge), but take the diff preview now: the reviewed diff if still cached,
+        # and before a commit would empty the live diff either way.
+        handoff_diff_preview = None
+        if not multi_agent_enabled:
+            handoff_diff_preview = workspace.get_diff_preview(40, cache_token=(iteration, question_round))
+
         if not approved:
             print("Max iterations reached. Task failed.")
             state_manager.add_to_history("Max iterations reached. Task failed.")
@@ -3437,8 +4126,9 @@ def main():
                 elif workspace.strategy == "worktree" and commit_on_approval:
                     commit_message = commit_message_template.format(task=task, run_id=state_manager.run_id)
                     commit_sha = workspace.commit_changes(commit_message)
-                    state_manager.update_state("commit_sha", commit_sha)
-                    state_manager.update_state("branch_name", workspace.branch_name)
+                    state_manager.update_many(
+                        {"commit_sha": commit_sha, "branch_name": workspace.branch_name}
+                    )
                     if workspace.branch_name:
                         print(f"Committed to branch: {workspace.branch_name}")
                     if commit_sha:
@@ -3451,10 +4141,14 @@ def main():
                             branch=merge_branch or "",
                             target=merge_target_branch,
                         )
-                        state_manager.update_state("merge_branch", merge_branch)
-                        state_manager.update_state("merge_target_branch", merge_target_branch)
-                        state_manager.update_state("stage", "merging")
-                        state_manager.update_state("merge_status", "running")
+                        state_manager.update_many(
+                            {
+                                "merge_branch": merge_branch,
+                                "merge_target_branch": merge_target_branch,
+                                "stage": "merging",
+                                "merge_status": "running",
+                            }
+                        )
                         merge_result = _auto_merge_worktree_branch(
                             repo_path=repo_path,
                             branch_name=merge_branch,
@@ -3466,29 +4160,13 @@ def main():
                             claude_client=claude_code_client,
                             task=task,
                             run_id=state_manager.run_id,
-                            plan=plan if isinstance(plan, dict) else None,
+                            plan=_dict_or_none(plan),
                             reviewer_decisions={"reviewer-1": review} if isinstance(review, dict) else None,
                             candidate=None,
                             note_fn=lambda msg: (print(msg), state_manager.add_to_history(msg)),
+                            use_rerere=merge_use_rerere,
                         )
-                        state_manager.update_state(
-                            "merge_status", "merged" if merge_result.get("merged") else "failed"
-                        )
-                        state_manager.update_state(
-                            "merge_commit_sha", merge_result.get("merge_commit_sha")
-                        )
-                        state_manager.update_state(
-                            "dirty_main_commit_sha", merge_result.get("dirty_main_commit_sha")
-                        )
-                        if merge_result.get("conflict_files"):
-                            state_manager.update_state(
-                                "merge_conflict_files", merge_result.get("conflict_files")
-                            )
-                        if merge_result.get("claude_merge_summary"):
-                            state_manager.update_state(
-                                "merge_resolution_summary",
-                                merge_result.get("claude_merge_summary"),
-                            )
+                        state_manager.update_many(_merge_result_state(merge_result))
                         if merge_result.get("merged"):
                             persisted = True
                             if delete_worktree_on_merge:
@@ -3513,47 +4191,12 @@ def main():
                 persisted = False
                 state_manager.add_to_history(f"Persistence step failed: {e}")
                 print(f"Persistence step failed: {e}")
-            state_manager.update_state("persisted", persisted)
-            state_manager.update_state("stage", "complete" if persisted else "persistence_failed")
+            state_manager.update_many(
+                {"persisted": persisted, "stage": "complete" if persisted else "persistence_failed"}
+            )
 
-        # Reviewer handoff summary (single-agent path)
-        if not multi_agent_enabled:
-            try:
-                diff = workspace.get_diff()
-                candidate = {
-                    "id": "single",
-                    "reviewer_id": "reviewer-1",
-                    "executor_id": "executor-1",
-                    "status": "APPROVED" if approved else "REJECTED",
-                    "test_summary": _summarize_test_results(test_results or {}),
-                    "executor_summary": implementation_result,
-                    "diff_preview": "\n".join(diff.splitlines()[:40]) if diff else "",
-                }
-                candidates_text = _candidate_summary_text(candidate)
-                handoff_prompt = _review_candidates_prompt(
-                    task=task or "",
-                    candidates_text=candidates_text,
-                    user_context=_format_user_context(user_qna),
-                    final_handoff=True,
-                )
-                handoff = codex_client.run_structured(
-                    prompt=handoff_prompt,
-                    schema_path=_reviewer_decision_schema_path(),
-                    cwd=workspace.path,
-                )
-                state_manager.update_state("handoff", {"reviewer-1": handoff})
-                if telegram_client:
-                    _send_telegram_message(
-                        state_manager=state_manager,
-                        telegram=telegram_client,
-                        text=(
-                            f"Reviewer summary:\n{handoff.get('summary')}\n\n"
-                            f"Next:\n{handoff.get('next_prompt')}"
-                        ),
-                        label="handoff_summary:single",
-                    )
-            except Exception as e:
-                state_manager.add_to_history(f"Handoff summary failed: {e}")
+        if handoff_diff_preview is not None:
+            _single_agent_handoff(handoff_diff_preview)
 
         run_completed = True
     finally:
@@ -3578,8 +4221,8 @@ def main():
         if ui and ui.is_running() and not ui_keep_alive_after_run and not session_mode:
             ui.stop()
         if run_completed:
-            state_manager.update_state("run_status", "stopped")
-            state_manager.update_state("run_completed", True)
+            state_manager.update_many({"run_status": "stopped", "run_completed": True})
+            _unregister_resume_candidate(logs_root, repo_path, state_manager.run_id)
 
     print("--- Orchestration Complete ---")
     print(f"Logs and state saved to: {state_manager.log_dir}")
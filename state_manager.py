@@ -1,12 +1,25 @@
 
+import atexit
 import json
 import os
 import shutil
+import sys
 import threading
+import time
 import uuid
 from datetime import datetime
 from typing import Optional
 
+try:
+    import orjson  # type: ignore
+except ModuleNotFoundError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+# Parses run state, Q/A logs and agent output across modules; orjson errors subclass
+# json.JSONDecodeError, and both raise ValueError for undecodable bytes.
+json_loads = orjson.loads if orjson is not None else json.loads
+
+
 class StateManager:
     """Manages the state and history of the orchestration loop."""
 
@@ -16,6 +29,7 @@ class StateManager:
         run_id: Optional[str] = None,
         *,
         load_existing: bool = False,
+        flush_debounce_ms: int = 0,
     ):
         """Initializes the StateManager.
 
@@ -23,6 +37,8 @@ class StateManager:
             logs_root: Root directory where run logs should be written.
                 If omitted, defaults to a `logs/` folder under the current working directory.
             run_id: Optional stable run id for reproducibility/testing.
+            flush_debounce_ms: If > 0, `update_state`/`update_many` coalesce writes made within this window
+                into one save. History appends and terminal keys still save immediately.
         """
         self.run_id = run_id or str(uuid.uuid4())
 
@@ -35,15 +51,116 @@ class StateManager:
         self.state = {}
         self.history = []
         self._lock = threading.RLock()
+        # Debounced saves are written by one long-lived writer thread that snapshots state under
+        # `_lock` and does the file I/O outside it, so callers never wait on an fsync.
+        self._flush_cv = threading.Condition(self._lock)
+        self._flush_due: Optional[float] = None
+        self._writer: Optional[threading.Thread] = None
+        # File writes are serialized separately; sequence numbers keep an older snapshot from
+        # overwriting a newer one that reached the disk first.
+        self._write_lock = threading.Lock()
+        self._state_seq = 0
+        self._state_written_seq = 0
+        # Entries already in history.log; new ones are appended instead of rewriting the file.
+        self._history_on_disk = 0
+        self._state_dirty = False
+        self._history_dirty = False
+        self.flush_debounce_ms = max(int(flush_debounce_ms or 0), 0)
         if load_existing:
             self.load_state()
             self.load_history()
 
+    # Keys whose changes must reach disk right away (resume relies on them).
+    _SYNC_KEYS = frozenset({"run_status", "run_completed"})
+
+    # Values that can't change behind our back, so an equal one means there is nothing to save.
+    # Containers are always saved: callers often mutate a list/dict in place and pass it again.
+    _IMMUTABLE_TYPES = (str, int, float, bool, type(None))
+
+    def _is_unchanged(self, key, value) -> bool:
+        if type(value) not in self._IMMUTABLE_TYPES or key not in self.state:
+            return False
+        current = self.state[key]
+        return type(current) is type(value) and current == value
+
     def update_state(self, key, value):
-        """Updates a key in the current state."""
+        """Updates a key in the current state (a no-op if an immutable value is unchanged)."""
         with self._lock:
+            if self._is_unchanged(key, value):
+                return
             self.state[key] = value
-            self.save_state()
+            if self.flush_debounce_ms and key not in self._SYNC_KEYS:
+                self._state_dirty = True
+                self._schedule_flush(self.flush_debounce_ms)
+            else:
+                self.save_state()
+
+    def update_many(self, values):
+        """Updates several keys at once with a single save (debounced like `update_state`)."""
+        with self._lock:
+            values = {key: value for key, value in values.items() if not self._is_unchanged(key, value)}
+            if not values:
+                return
+            self.state.update(values)
+            if self.flush_debounce_ms and self._SYNC_KEYS.isdisjoint(values):
+                self._state_dirty = True
+                self._schedule_flush(self.flush_debounce_ms)
+            else:
+                self.save_state()
+
+    def update_state_deferred(self, key, value, *, debounce_ms: int = 250):
+        """Updates a key in memory and schedules a single coalesced save.
+
+        Repeated calls within `debounce_ms` result in one write. Call `flush_deferred()`
+        to persist pending changes immediately.
+        """
+        with self._lock:
+            self.state[key] = value
+            self._state_dirty = True
+            self._schedule_flush(debounce_ms)
+
+    def add_to_history_deferred(self, event, *, debounce_ms: int = 250):
+        """Adds an event to the history and schedules a single coalesced save."""
+        timestamp = datetime.now().isoformat()
+        with self._lock:
+            self.history.append(f"[{timestamp}] {event}")
+            self._history_dirty = True
+            self._schedule_flush(debounce_ms)
+
+    def flush_deferred(self):
+        """Writes any pending deferred state/history changes now."""
+        with self._lock:
+            self._flush_due = None
+            state_snapshot = self._snapshot_state() if self._state_dirty else None
+            if self._history_dirty:
+                # Appends are small and must stay in order, so they happen under the lock.
+                self._append_history()
+        if state_snapshot is not None:
+            self._write_state(*state_snapshot)
+
+    def _schedule_flush(self, debounce_ms: int) -> None:
+        if self._flush_due is not None:
+            return
+        self._flush_due = time.monotonic() + max(debounce_ms, 0) / 1000.0
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._writer_loop, name="state-writer", daemon=True)
+            self._writer.start()
+            # The writer is a daemon thread; make sure a pending write survives exit.
+            atexit.register(self.flush_deferred)
+        self._flush_cv.notify()
+
+    def _writer_loop(self) -> None:
+        while True:
+            with self._flush_cv:
+                while self._flush_due is None or self._flush_due > time.monotonic():
+                    timeout = None if self._flush_due is None else self._flush_due - time.monotonic()
+                    self._flush_cv.wait(timeout)
+            try:
+                self.flush_deferred()
+            except Exception as e:
+                # Nobody is waiting on this write to raise to. Report it and keep the writer alive;
+                # the state stays dirty, so the next update (or the exit flush) tries again.
+                print(f"State save failed: {e!r}", file=sys.stderr)
 
     def get_state(self, key):
         """Retrieves a key from the current state."""
@@ -55,46 +172,124 @@ class StateManager:
         timestamp = datetime.now().isoformat()
         with self._lock:
             self.history.append(f"[{timestamp}] {event}")
+            # Keep state.json at least as fresh as the history it is read alongside.
+            if self._state_dirty:
+                self.save_state()
             self.save_history()
 
+    def add_user_qna(self, entries):
+        """Appends answered questions to user_qna.jsonl, one JSON object per line.
+
+        state.json only records `user_qna_count`, so an answer round costs an append instead of
+        re-serializing every earlier answer on each state save. See `load_user_qna`.
+        """
+        if not entries:
+            return
+        with self._lock:
+            # Runs started before the journal kept the list in state.json; move it over first.
+            legacy = self.state.pop("user_qna", None)
+            entries = (legacy if isinstance(legacy, list) else []) + list(entries)
+            if orjson is not None:
+                data = b"".join(orjson.dumps(entry) + b"\n" for entry in entries)
+            else:
+                data = "".join(json.dumps(entry) + "\n" for entry in entries).encode("utf-8")
+            with open(os.path.join(self.log_dir, "user_qna.jsonl"), "a+b") as f:
+                # Start on a fresh line if an earlier append was cut short.
+                end = f.seek(0, os.SEEK_END)
+                if end:
+                    f.seek(end - 1)
+                    if f.read(1) != b"\n":
+                        data = b"\n" + data
+                f.write(data)
+            count = self.state.get("user_qna_count")
+            self.update_state("user_qna_count", (count if isinstance(count, int) else 0) + len(entries))
+
+    def load_user_qna(self) -> list:
+        """Returns the answered questions recorded by `add_user_qna` (or a legacy state.json list)."""
+        with self._lock:
+            try:
+                with open(os.path.join(self.log_dir, "user_qna.jsonl"), "rb") as f:
+                    lines = f.read().splitlines()
+            except FileNotFoundError:
+                legacy = self.state.get("user_qna")
+                return list(legacy) if isinstance(legacy, list) else []
+        entries = []
+        for line in lines:
+            try:
+                entries.append(json_loads(line))
+            except ValueError:
+                # Blank or torn line (e.g. the process died mid-append).
+                continue
+        return entries
+
     def save_state(self):
         """Saves the current state to a file."""
         with self._lock:
+            snapshot = self._snapshot_state()
+            # Synchronous saves keep the caller ordered with the file, as before.
+            self._write_state(*snapshot)
+
+    def save_history(self):
+        """Saves the history to a file."""
+        with self._lock:
+            self._append_history()
+
+    def _snapshot_state(self) -> tuple[int, bytes]:
+        # Encode under `_lock`: callers mutate nested values (lists, dicts) in place.
+        if orjson is not None:
+            data = orjson.dumps(self.state, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        else:
+            data = json.dumps(self.state, indent=2).encode("utf-8")
+        self._state_seq += 1
+        self._state_dirty = False
+        return self._state_seq, data
+
+    def _write_state(self, seq: int, data: bytes) -> None:
+        with self._write_lock:
+            if seq <= self._state_written_seq:
+                return
             path = os.path.join(self.log_dir, "state.json")
             tmp_path = f"{path}.tmp"
             bak_path = f"{path}.bak"
-            with open(tmp_path, "w") as f:
-                json.dump(self.state, f, indent=2)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
                 f.flush()
                 os.fsync(f.fileno())
-            if os.path.exists(path):
-                try:
-                    shutil.copy2(path, bak_path)
-                except OSError:
-                    pass
+            try:
+                shutil.copy2(path, bak_path)
+            except OSError:  # includes FileNotFoundError on the first write
+                pass
             os.replace(tmp_path, path)
+            self._state_written_seq = seq
 
-    def save_history(self):
-        """Saves the history to a file."""
-        with self._lock:
-            with open(os.path.join(self.log_dir, "history.log"), "w") as f:
+    def _append_history(self) -> None:
+        # Called with `_lock` held. The file is "\n".join(history); the first write replaces it.
+        path = os.path.join(self.log_dir, "history.log")
+        written = self._history_on_disk
+        if written == 0 or written > len(self.history):
+            with open(path, "w") as f:
                 f.write("\n".join(self.history))
+        elif written < len(self.history):
+            with open(path, "a") as f:
+                f.write("\n" + "\n".join(self.history[written:]))
+        self._history_on_disk = len(self.history)
+        self._history_dirty = False
 
     def load_state(self):
         """Loads state from disk if present."""
         path = os.path.join(self.log_dir, "state.json")
         with self._lock:
             try:
-                with open(path, "r") as f:
-                    self.state = json.load(f)
+                with open(path, "rb") as f:
+                    self.state = json_loads(f.read())
             except FileNotFoundError:
                 self.state = {}
-            except json.JSONDecodeError:
+            except ValueError:
                 bak_path = f"{path}.bak"
                 try:
-                    with open(bak_path, "r") as f:
-                        self.state = json.load(f)
-                except (FileNotFoundError, json.JSONDecodeError):
+                    with open(bak_path, "rb") as f:
+                        self.state = json_loads(f.read())
+                except (FileNotFoundError, ValueError):
                     # Corrupted or mid-write; keep existing in-memory state.
                     pass
 
@@ -106,5 +301,6 @@ class StateManager:
                 with open(path, "r") as f:
                     data = f.read().splitlines()
                 self.history = data
+                self._history_on_disk = len(data)
             except FileNotFoundError:
                 self.history = []
@@ -0,0 +1,24 @@
+const { spawnSync } = require('child_process');
+const fs = require('fs');
+const path = require('path');
+
+// Same as codex_mock.js, except every candidate review is a unanimous REJECTED with remaining work.
+function main() {
+  const argv = process.argv.slice(2);
+  const result = spawnSync('node', [path.join(__dirname, 'codex_mock.js'), ...argv], { stdio: 'inherit' });
+  if (result.status !== 0) process.exit(result.status ?? 1);
+
+  const prompt = argv[argv.length - 1] || '';
+  if (!prompt.includes('PHASE: REVIEW_CANDIDATES')) process.exit(0);
+
+  const outputLastMessage = argv[argv.indexOf('--output-last-message') + 1];
+  const response = JSON.parse(fs.readFileSync(outputLastMessage, 'utf8'));
+  response.status = 'REJECTED';
+  response.summary = 'Rejected best candidate.';
+  response.feedback = 'Edge cases are still missing.';
+  response.next_prompt = 'Remaining work: handle negative zero.';
+  fs.writeFileSync(outputLastMessage, JSON.stringify(response, null, 2), 'utf8');
+  process.exit(0);
+}
+
+main();
@@ -0,0 +1,53 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import main
+
+
+class ConfigTest(unittest.TestCase):
+    def test_resolve_config_path_precedence(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="luigi-cfg-") as repo_path:
+            default = main.resolve_config_path(None, repo_path=repo_path)
+            self.assertEqual(os.path.basename(default), "config.yaml")
+            self.assertNotEqual(os.path.dirname(default), repo_path)
+
+            for name in ("luigi.config.yml", "luigi.config.json"):
+                open(os.path.join(repo_path, name), "w").close()
+            self.assertEqual(
+                main.resolve_config_path(None, repo_path=repo_path),
+                os.path.join(repo_path, "luigi.config.json"),
+            )
+
+            os.makedirs(os.path.join(repo_path, ".luigi"))
+            open(os.path.join(repo_path, ".luigi", "config.yaml"), "w").close()
+            # A directory that happens to carry a config name is not a config file.
+            os.makedirs(os.path.join(repo_path, ".luigi", "config.json"))
+            self.assertEqual(
+                main.resolve_config_path(None, repo_path=repo_path),
+                os.path.join(repo_path, ".luigi", "config.yaml"),
+            )
+            self.assertEqual(main.resolve_config_path("x.yaml", repo_path=repo_path), "x.yaml")
+
+    def test_load_config_reads_json_shaped_yaml_without_pyyaml(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="luigi-cfg-") as tmp:
+            cfg_path = os.path.join(tmp, "luigi.config.yml")
+            with open(cfg_path, "w") as f:
+                f.write('\n  {"orchestrator": {"max_iterations": 2}}\n')
+            with mock.patch.dict(sys.modules, {"yaml": None}):
+                self.assertEqual(main.load_config(cfg_path), {"orchestrator": {"max_iterations": 2}})
+
+            # A YAML flow mapping is not JSON and still goes through PyYAML.
+            with open(cfg_path, "w") as f:
+                f.write("{orchestrator: {max_iterations: 3}}\n")
+            try:
+                import yaml  # noqa: F401
+            except ModuleNotFoundError:
+                self.skipTest("PyYAML not installed")
+            self.assertEqual(main.load_config(cfg_path), {"orchestrator": {"max_iterations": 3}})
+
+
+if __name__ == "__main__":
+    unittest.main()
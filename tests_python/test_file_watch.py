@@ -0,0 +1,72 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import file_watch
+
+
+class FileWatchTest(unittest.TestCase):
+    def test_wait_for_file_wakes_on_atomic_rename(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="luigi-watch-") as tmp:
+            path = os.path.join(tmp, "response.json")
+
+            def _write() -> None:
+                time.sleep(0.2)
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump({"ok": True}, f)
+                os.replace(tmp_path, path)
+
+            writer = threading.Thread(target=_write)
+            writer.start()
+            started = time.monotonic()
+            self.assertTrue(file_watch.wait_for_file(path, 5.0, poll_interval_sec=2.0))
+            self.assertLess(time.monotonic() - started, 1.5)
+            writer.join()
+
+    def test_wait_for_file_times_out(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="luigi-watch-") as tmp:
+            path = os.path.join(tmp, "missing.json")
+            self.assertFalse(file_watch.wait_for_file(path, 0.1, poll_interval_sec=0.05))
+
+    def test_wait_for_file_returns_when_cancelled(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="luigi-watch-") as tmp:
+            path = os.path.join(tmp, "missing.json")
+            read_fd, write_fd = os.pipe()
+            try:
+                timer = threading.Timer(0.2, os.write, args=(write_fd, b"x"))
+                timer.start()
+                started = time.monotonic()
+                self.assertFalse(file_watch.wait_for_file(path, None, poll_interval_sec=2.0, cancel_fd=read_fd))
+                self.assertLess(time.monotonic() - started, 1.5)
+                timer.join()
+            finally:
+                os.close(read_fd)
+                os.close(write_fd)
+
+    def test_polling_fallback_backs_off(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="luigi-watch-") as tmp:
+            path = os.path.join(tmp, "missing.json")
+            clock = [0.0]
+            delays: list = []
+
+            def _sleep(delay: float) -> None:
+                delays.append(delay)
+                clock[0] += delay
+
+            with mock.patch.object(file_watch, "_inotify_libc", return_value=None), mock.patch.object(
+                file_watch.time, "monotonic", side_effect=lambda: clock[0]
+            ), mock.patch.object(file_watch.time, "sleep", side_effect=_sleep):
+                self.assertFalse(file_watch.wait_for_file(path, 10.0, poll_interval_sec=0.5))
+            self.assertAlmostEqual(delays[0], 0.05)
+            self.assertEqual(delays[:-1], sorted(delays[:-1]))
+            self.assertAlmostEqual(max(delays), 2.0)
+            self.assertLess(len(delays), 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
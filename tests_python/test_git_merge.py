@@ -0,0 +1,152 @@
+import os
+import subprocess
+import tempfile
+import unittest
+
+import main
+
+
+class GitMergeTest(unittest.TestCase):
+    def test_git_status_v2_reports_branch_head_and_dirty(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="luigi-git-") as repo_path:
+            subprocess.run(["git", "init", "-b", "main"], cwd=repo_path, check=True, capture_output=True)
+            with open(os.path.join(repo_path, "file.txt"), "w") as f:
+                f.write("hello")
+            subprocess.run(["git", "add", "."], cwd=repo_path, check=True, capture_output=True)
+            subprocess.run(["git", "commit", "-m", "init"], cwd=repo_path, check=True, capture_output=True)
+
+            status = main._git_status_v2(repo_path)
+            self.assertEqual(status["branch"], "main")
+            self.assertEqual(status["head"], main._git_head_sha(repo_path))
+            self.assertFalse(status["dirty"])
+
+            with open(os.path.join(repo_path, "new.txt"), "w") as f:
+                f.write("x")
+            self.assertTrue(main._git_status_v2(repo_path)["dirty"])
+
+    def test_git_merge_commit_for_branch(self) -> None:
+        def git(*args: str) -> None:
+            subprocess.run(["git", *args], cwd=repo_path, check=True, capture_output=True)
+
+        with tempfile.TemporaryDirectory(prefix="luigi-git-") as repo_path:
+            git("init", "-b", "main")
+            with open(os.path.join(repo_path, "file.txt"), "w") as f:
+                f.write("hello")
+            git("add", ".")
+            git("commit", "-m", "init")
+            git("checkout", "-b", "feature")
+            with open(os.path.join(repo_path, "feature.txt"), "w") as f:
+                f.write("x")
+            git("add", ".")
+            git("commit", "-m", "feature")
+            git("checkout", "main")
+            self.assertIsNone(main._git_merge_commit_for_branch(repo_path, "feature"))
+
+            git("merge", "--no-ff", "-m", "merge feature", "feature")
+            self.assertEqual(
+                main._git_merge_commit_for_branch(repo_path, "feature"),
+                main._git_head_sha(repo_path),
+            )
+
+    def test_git_post_merge_state(self) -> None:
+        def git(*args: str, check: bool = True) -> None:
+            subprocess.run(["git", *args], cwd=repo_path, check=check, capture_output=True)
+
+        with tempfile.TemporaryDirectory(prefix="luigi-git-") as repo_path:
+            git("init", "-b", "main")
+            with open(os.path.join(repo_path, "a b.txt"), "w") as f:
+                f.write("base\n")
+            git("add", ".")
+            git("commit", "-m", "init")
+            self.assertEqual(main._git_post_merge_state(repo_path), ([], False))
+
+            git("checkout", "-b", "feature")
+            with open(os.path.join(repo_path, "a b.txt"), "w") as f:
+                f.write("feature\n")
+            git("commit", "-am", "feature")
+            git("checkout", "main")
+            with open(os.path.join(repo_path, "a b.txt"), "w") as f:
+                f.write("main\n")
+            git("commit", "-am", "main")
+            git("merge", "feature", check=False)
+            self.assertEqual(main._git_post_merge_state(repo_path), (["a b.txt"], True))
+
+            with open(os.path.join(repo_path, "a b.txt"), "w") as f:
+                f.write("resolved\n")
+            git("add", ".")
+            self.assertEqual(main._git_post_merge_state(repo_path), ([], True))
+
+    def test_auto_merge_replays_recorded_resolution(self) -> None:
+        def git(*args: str, check: bool = True) -> None:
+            subprocess.run(["git", *args], cwd=repo_path, check=check, capture_output=True)
+
+        def write(text: str) -> None:
+            with open(os.path.join(repo_path, "file.txt"), "w") as f:
+                f.write(text)
+
+        def merge() -> dict:
+            return main._auto_merge_worktree_branch(
+                repo_path=repo_path,
+                branch_name="feature",
+                target_branch="main",
+                merge_style="merge_commit",
+                dirty_main_policy="abort",
+                dirty_main_commit_message_template="",
+                merge_commit_message="merge feature",
+                claude_client=None,
+                task="t",
+                run_id="r",
+                plan=None,
+                reviewer_decisions=None,
+                candidate=None,
+            )
+
+        with tempfile.TemporaryDirectory(prefix="luigi-git-") as repo_path:
+            git("init", "-b", "main")
+            write("base\n")
+            git("add", ".")
+            git("commit", "-m", "init")
+            git("checkout", "-b", "feature")
+            write("feature\n")
+            git("commit", "-am", "feature")
+            git("checkout", "main")
+            write("main\n")
+            git("commit", "-am", "main")
+
+            # No recorded resolution yet and no Claude client: the merge fails.
+            first = merge()
+            self.assertFalse(first["merged"])
+            self.assertEqual(first["conflict_files"], ["file.txt"])
+
+            # Resolve by hand once; rerere records the resolution on commit.
+            write("resolved\n")
+            git("add", ".")
+            git("-c", "rerere.enabled=true", "commit", "-m", "manual merge")
+            git("reset", "--hard", "HEAD^")
+
+            second = merge()
+            self.assertTrue(second["merged"], second)
+            self.assertTrue(second.get("rerere_resolved"))
+            with open(os.path.join(repo_path, "file.txt")) as f:
+                self.assertEqual(f.read(), "resolved\n")
+
+    def test_local_branch_worktree(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="luigi-git-") as tmp:
+            repo_path = os.path.join(tmp, "repo")
+            os.makedirs(repo_path)
+            for args in (["init", "-b", "main"], ["commit", "--allow-empty", "-m", "init"], ["branch", "feature"]):
+                subprocess.run(["git", *args], cwd=repo_path, check=True, capture_output=True)
+            self.assertEqual(main._local_branch_worktree(repo_path, "feature"), (True, None))
+            self.assertEqual(main._local_branch_worktree(repo_path, "feat"), (False, None))
+
+            wt_path = os.path.join(tmp, "wt")
+            subprocess.run(
+                ["git", "worktree", "add", wt_path, "feature"], cwd=repo_path, check=True, capture_output=True
+            )
+            exists, path = main._local_branch_worktree(repo_path, "feature")
+            self.assertTrue(exists)
+            self.assertEqual(os.path.realpath(path), os.path.realpath(wt_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,7 +3,11 @@ import os
 import shutil
 import subprocess
 import tempfile
+import types
 import unittest
+from unittest import mock
+
+import main
 
 
 REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -145,6 +149,76 @@ class MultiAgentExecutorFeedbackTest(unittest.TestCase):
             self.assertIn('throw new Error("Division by zero")', content)
 
 
+    def test_admin_accepted_rejection_still_runs_handoff(self) -> None:
+        fixture_src = os.path.join(REPO_ROOT, "tests", "fixtures", "target-project")
+
+        with tempfile.TemporaryDirectory(prefix="luigi-it-multi-accept-partial-") as tmp:
+            target_repo = os.path.join(tmp, "target-project")
+            shutil.copytree(fixture_src, target_repo)
+            logs_dir = os.path.join(tmp, "logs")
+
+            config = {
+                "codex": {
+                    "command": ["node", os.path.join(REPO_ROOT, "tests", "mocks", "codex_reviewer_mock_rejects.js")],
+                    "model": "gpt-5.2-codex",
+                    "reasoning_effort": "xhigh",
+                    "sandbox": "read-only",
+                    "approval_policy": "never",
+                },
+                "claude_code": {
+                    "command": ["node", os.path.join(REPO_ROOT, "tests", "mocks", "claude_mock.js")],
+                    "model": "opus",
+                    "allowed_tools": ["Bash", "Read", "Edit", "Write", "Glob", "Grep"],
+                    "max_turns": 1,
+                },
+                "agents": {
+                    "reviewers": [{"id": "reviewer-1", "kind": "codex"}],
+                    "executors": [{"id": "executor-1", "kind": "claude"}],
+                    "assignment": {"executors_per_plan": 1},
+                },
+                "orchestrator": {
+                    "multi_agent": True,
+                    "max_iterations": 1,
+                    "working_dir": os.path.join(tmp, "workspaces"),
+                    "logs_dir": logs_dir,
+                    "workspace_strategy": "copy",
+                    "use_git_worktree": False,
+                    "cleanup": "always",
+                    "apply_changes_on_success": True,
+                    "commit_on_approval": False,
+                },
+                "testing": {"timeout_sec": 60, "install_if_missing": False},
+            }
+            config_path = os.path.join(tmp, "config.mock.json")
+            with open(config_path, "w") as f:
+                json.dump(config, f)
+
+            # A running UI lets the iteration limit ask the admin, who accepts the partial result.
+            ui = types.SimpleNamespace(
+                url="http://localhost",
+                port=0,
+                host="localhost",
+                log_path="",
+                project_id="p",
+                is_running=lambda: True,
+                stop=lambda: None,
+            )
+            argv = ["main.py", "Fix division by zero in divide()", "--repo", target_repo, "--config", config_path]
+            with mock.patch.object(main, "start_streamlit_ui", return_value=ui):
+                with mock.patch.object(main, "_await_admin_decision", return_value={"choice": 1}) as admin:
+                    with mock.patch("sys.argv", argv):
+                        main.main()
+
+            self.assertTrue(admin.called)
+            (run_id,) = os.listdir(logs_dir)
+            with open(os.path.join(logs_dir, run_id, "state.json"), "r") as f:
+                state = json.load(f)
+            self.assertTrue(state["approved_by_admin"])
+            # The REJECTED review is not reused; the reviewers write a fresh handoff.
+            self.assertEqual(state["handoff"]["reviewer-1"]["status"], "APPROVED")
+            self.assertEqual(state["handoff"]["reviewer-1"]["summary"], "Handoff: approved and ready to merge.")
+
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -26,6 +26,15 @@ class MultiAgentUtilsTest(unittest.TestCase):
         self.assertTrue(result["consensus"])
         self.assertEqual(result["winner"], "c1")
 
+    def test_compute_consensus_requires_matching_next_prompt(self) -> None:
+        decisions = {
+            "r1": {"status": "REJECTED", "winner_candidate_id": "c1", "next_prompt": "do X"},
+            "r2": {"status": "REJECTED", "winner_candidate_id": "c1", "next_prompt": "do Y"},
+        }
+        result = main._compute_consensus(decisions)
+        self.assertFalse(result["consensus"])
+        self.assertIsNone(result["winner"])
+
     def test_validate_reviewer_decision_disallows_next_prompt_on_approved(self) -> None:
         with self.assertRaises(RuntimeError):
             main._validate_reviewer_decision(
@@ -41,12 +50,74 @@ class MultiAgentUtilsTest(unittest.TestCase):
                 {"c1"},
             )
 
+    def test_unanswered_questions_skips_answered_and_repeats(self) -> None:
+        answered = [{"question": "Which  database?", "answer": "Postgres"}]
+        pending = main._unanswered_questions(
+            ["which database?", "Keep the old API?", "keep the old API? "],
+            answered,
+        )
+        self.assertEqual(pending, ["Keep the old API?"])
+
+    def test_user_context_appends_new_answers(self) -> None:
+        qna = [{"question": "Which database?", "answer": "Postgres"}]
+        context = main._UserContext(qna)
+        new_qna = [{"question": "", "answer": "ignored"}, {"question": "Keep the old API?", "answer": " yes "}]
+        context.add(new_qna)
+        self.assertEqual(context.render(), main._format_user_context(qna + new_qna))
+
+    def test_user_context_keeps_latest_answer_and_abridges_old_ones(self) -> None:
+        context = main._UserContext(
+            [
+                {"question": "Which database?", "answer": "MySQL"},
+                {"question": "Keep the old API?", "answer": "Yes.\nBut deprecate it."},
+            ],
+            max_entries=2,
+        )
+        context.add([{"question": "which  database?", "answer": "Postgres"}])
+        self.assertEqual(
+            context.render(),
+            "Q: Keep the old API?\nA: Yes.\nBut deprecate it.\n\nQ: which  database?\nA: Postgres",
+        )
+        context.add([{"question": "Target Python?", "answer": "3.11"}])
+        self.assertEqual(
+            context.render(),
+            "Q: Keep the old API?\nA: Yes. [...]\n\n"
+            "Q: which  database?\nA: Postgres\n\n"
+            "Q: Target Python?\nA: 3.11",
+        )
+
+    def test_abridged_answers_can_be_asked_again(self) -> None:
+        context = main._UserContext(
+            [
+                {"question": "Keep the old API?", "answer": "Yes.\nBut deprecate it."},
+                {"question": "Which database?", "answer": "Postgres"},
+                {"question": "Target Python?", "answer": "3.11"},
+            ],
+            max_entries=2,
+        )
+        self.assertIn("A: Yes. [...]", context.render())
+        pending = main._unanswered_questions(
+            ["Keep the old API?", "Which database?", "Add a changelog entry?"],
+            context.answered(),
+        )
+        self.assertEqual(pending, ["Keep the old API?", "Add a changelog entry?"])
+
     def test_parse_admin_choice(self) -> None:
         parsed = main._parse_admin_choice("choose 2\nnotes: add context\nextra line")
         self.assertEqual(parsed["choice"], 2)
         self.assertIn("add context", parsed["notes"])
 
+    def test_next_telegram_offset_acknowledges_latest_update(self) -> None:
+        updates = {"result": [{"update_id": 7}, {"update_id": 5}, {"update_id": "x"}]}
+        self.assertEqual(main._next_telegram_offset(updates, None), 8)
+        self.assertEqual(main._next_telegram_offset(updates, 10), 10)
+        self.assertEqual(main._next_telegram_offset({}, 3), 3)
+
+    def test_pack_telegram_sections_respects_limit(self) -> None:
+        packed = main._pack_telegram_sections(["a" * 4, "b" * 4, "c" * 12], separator="|", limit=10)
+        self.assertEqual(packed, ["aaaa|bbbb", "cccccccccc", "cc"])
+        self.assertTrue(all(len(msg) <= 10 for msg in packed))
+
 
 if __name__ == "__main__":
     unittest.main()
-
@@ -73,6 +73,29 @@ class ResumeOrchestratorModeTest(unittest.TestCase):
 
             self.assertTrue(mocked_multi.called, "Expected multi-agent session on resume.")
 
+    def test_infer_resume_step(self) -> None:
+        base = {
+            "plan": None,
+            "claude_structured": None,
+            "implementation_result": None,
+            "test_results": None,
+            "review": None,
+        }
+        self.assertEqual(main._infer_resume_step(resume_stage="testing", **base), "tests")
+        self.assertEqual(main._infer_resume_step(resume_stage="review_ready", **base), "review")
+        self.assertEqual(
+            main._infer_resume_step(**{**base, "resume_stage": "review_ready", "review": {"status": "REJECTED"}}),
+            "next_iteration",
+        )
+        self.assertEqual(
+            main._infer_resume_step(**{**base, "resume_stage": None, "plan": {"status": "OK"}}),
+            "implement",
+        )
+        self.assertEqual(
+            main._infer_resume_step(**{**base, "resume_stage": None, "review": {"status": ["odd"]}}),
+            "planning",
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
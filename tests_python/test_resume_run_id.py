@@ -1,7 +1,9 @@
 import json
 import os
 import tempfile
+import threading
 import unittest
+from unittest import mock
 
 import main
 
@@ -30,6 +32,27 @@ class ResumeRunIdTest(unittest.TestCase):
             self.assertEqual(resume_id, run_id)
             self.assertEqual(resume_state.get("repo_path"), repo_path)
 
+    def test_load_resume_state_by_id_rereads_changed_state(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="luigi-logs-") as tmp:
+            run_id = "run-789"
+            run_dir = os.path.join(tmp, run_id)
+            os.makedirs(run_dir, exist_ok=True)
+            repo_path = os.path.join(tmp, "repo")
+            os.makedirs(repo_path, exist_ok=True)
+            state_path = os.path.join(run_dir, "state.json")
+            with open(state_path, "w") as f:
+                json.dump({"repo_path": repo_path, "stage": "planning"}, f)
+
+            _, first = main._load_resume_state_by_id(logs_root=tmp, repo_path=repo_path, run_id=run_id)
+            first["stage"] = "mutated"
+            _, again = main._load_resume_state_by_id(logs_root=tmp, repo_path=repo_path, run_id=run_id)
+            self.assertEqual(again["stage"], "planning")
+
+            with open(state_path, "w") as f:
+                json.dump({"repo_path": repo_path, "stage": "implementing"}, f)
+            _, updated = main._load_resume_state_by_id(logs_root=tmp, repo_path=repo_path, run_id=run_id)
+            self.assertEqual(updated["stage"], "implementing")
+
     def test_load_resume_state_by_id_rejects_path_traversal(self) -> None:
         with tempfile.TemporaryDirectory(prefix="luigi-logs-") as tmp:
             repo_path = os.path.join(tmp, "repo")
@@ -59,6 +82,107 @@ class ResumeRunIdTest(unittest.TestCase):
                     run_id=run_id,
                 )
 
+    def test_find_resume_state_picks_latest_running_run(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="luigi-logs-") as tmp:
+            repo_path = os.path.join(tmp, "repo")
+            os.makedirs(repo_path, exist_ok=True)
+            for idx, (run_id, status) in enumerate(
+                [("run-old", "running"), ("run-new", "running"), ("run-done", "stopped")]
+            ):
+                run_dir = os.path.join(tmp, run_id)
+                os.makedirs(run_dir, exist_ok=True)
+                state_path = os.path.join(run_dir, "state.json")
+                with open(state_path, "w") as f:
+                    json.dump({"repo_path": repo_path, "run_status": status}, f)
+                os.utime(state_path, (1000 + idx, 1000 + idx))
+            # Stray files next to run directories are ignored.
+            with open(os.path.join(tmp, "notes.txt"), "w") as f:
+                f.write("x")
+
+            found = main._find_resume_state(logs_root=tmp, repo_path=repo_path)
+            self.assertIsNotNone(found)
+            self.assertEqual(found[0], "run-new")
+
+    def test_find_resume_state_without_logs_root(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="luigi-logs-") as tmp:
+            missing = os.path.join(tmp, "missing")
+            self.assertIsNone(main._find_resume_state(logs_root=missing, repo_path=tmp))
+            not_a_dir = os.path.join(tmp, "file")
+            with open(not_a_dir, "w") as f:
+                f.write("x")
+            self.assertIsNone(main._find_resume_state(logs_root=not_a_dir, repo_path=tmp))
+
+    def test_find_resume_state_uses_and_maintains_repo_index(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="luigi-logs-") as tmp:
+            repo_path = os.path.join(tmp, "repo")
+            os.makedirs(repo_path, exist_ok=True)
+
+            def write_run(run_id: str, status: str) -> None:
+                os.makedirs(os.path.join(tmp, run_id), exist_ok=True)
+                with open(os.path.join(tmp, run_id, "state.json"), "w") as f:
+                    json.dump({"repo_path": repo_path, "run_status": status}, f)
+
+            write_run("run-a", "running")
+            write_run("run-b", "stopped")
+            # First lookup scans the logs and builds this repo's shortlist.
+            self.assertEqual(main._find_resume_state(logs_root=tmp, repo_path=repo_path)[0], "run-a")
+            index = main._read_resume_index(tmp)
+            self.assertEqual(index[main._resume_index_key(repo_path)], ["run-a"])
+
+            # Runs started later are registered; unregistered ones are not scanned any more.
+            write_run("run-c", "running")
+            main._register_resume_candidate(tmp, repo_path, "run-c")
+            write_run("run-unindexed", "running")
+            main._unregister_resume_candidate(tmp, repo_path, "run-a")
+            self.assertEqual(main._find_resume_state(logs_root=tmp, repo_path=repo_path)[0], "run-c")
+
+            # A shortlisted run that is no longer running is pruned on lookup.
+            write_run("run-c", "stopped")
+            self.assertIsNone(main._find_resume_state(logs_root=tmp, repo_path=repo_path))
+            self.assertEqual(main._read_resume_index(tmp)[main._resume_index_key(repo_path)], [])
+
+
+    def test_find_resume_state_keeps_runs_registered_during_lookup(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="luigi-logs-") as tmp:
+            repo_path = os.path.join(tmp, "repo")
+            os.makedirs(repo_path, exist_ok=True)
+            key = main._resume_index_key(repo_path)
+
+            def write_run(run_id: str, status: str) -> None:
+                os.makedirs(os.path.join(tmp, run_id), exist_ok=True)
+                with open(os.path.join(tmp, run_id, "state.json"), "w") as f:
+                    json.dump({"repo_path": repo_path, "run_status": status}, f)
+
+            scan = main._scan_resume_run
+            registrations = []
+
+            def scan_while_a_run_starts(*args):
+                # Another process starts a run while this lookup is scanning.
+                if not registrations:
+                    write_run("run-r", "running")
+                    registrations.append(
+                        threading.Thread(target=main._register_resume_candidate, args=(tmp, repo_path, "run-r"))
+                    )
+                    registrations[-1].start()
+                    registrations[-1].join(timeout=0.2)
+                return scan(*args)
+
+            write_run("run-a", "running")
+            # First lookup: the run registering mid-scan must end up in the shortlist being built.
+            with mock.patch.object(main, "_scan_resume_run", side_effect=scan_while_a_run_starts):
+                self.assertEqual(main._find_resume_state(logs_root=tmp, repo_path=repo_path)[0], "run-a")
+            registrations[0].join(timeout=5)
+            self.assertEqual(sorted(main._read_resume_index(tmp)[key]), ["run-a", "run-r"])
+
+            # Pruning a dead run must not drop one registered while the lookup was in flight.
+            write_run("run-a", "stopped")
+            registrations.clear()
+            main._unregister_resume_candidate(tmp, repo_path, "run-r")
+            with mock.patch.object(main, "_scan_resume_run", side_effect=scan_while_a_run_starts):
+                self.assertIsNone(main._find_resume_state(logs_root=tmp, repo_path=repo_path))
+            registrations[0].join(timeout=5)
+            self.assertEqual(main._read_resume_index(tmp)[key], ["run-r"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,147 @@
+import io
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from state_manager import StateManager
+
+
+class StateManagerTest(unittest.TestCase):
+    def test_deferred_updates_are_coalesced_until_flush(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="luigi-state-") as tmp:
+            sm = StateManager(logs_root=tmp, run_id="run-1")
+            sm.update_state("stage", "executing")
+            sm.update_state_deferred("candidates", {"c1": {"status": "DONE"}}, debounce_ms=60_000)
+            sm.add_to_history_deferred("Candidate c1 finished", debounce_ms=60_000)
+
+            with open(os.path.join(sm.log_dir, "state.json"), "r") as f:
+                self.assertNotIn("candidates", json.load(f))
+
+            sm.flush_deferred()
+            with open(os.path.join(sm.log_dir, "state.json"), "r") as f:
+                self.assertEqual(json.load(f)["candidates"], {"c1": {"status": "DONE"}})
+            with open(os.path.join(sm.log_dir, "history.log"), "r") as f:
+                self.assertIn("Candidate c1 finished", f.read())
+
+    def test_update_many_writes_all_keys_once(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="luigi-state-") as tmp:
+            sm = StateManager(logs_root=tmp, run_id="run-1")
+            saves = []
+            original_save = sm.save_state
+            sm.save_state = lambda: (saves.append(1), original_save())
+            sm.update_many({"run_status": "running", "stage": "planning"})
+            self.assertEqual(len(saves), 1)
+            with open(os.path.join(sm.log_dir, "state.json"), "r") as f:
+                self.assertEqual(json.load(f), {"run_status": "running", "stage": "planning"})
+
+    def test_debounced_update_state_flushes_on_history_and_terminal_keys(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="luigi-state-") as tmp:
+            sm = StateManager(logs_root=tmp, run_id="run-1", flush_debounce_ms=60_000)
+            state_path = os.path.join(sm.log_dir, "state.json")
+            sm.update_state("stage", "planning")
+            self.assertFalse(os.path.exists(state_path))
+
+            sm.add_to_history("Planning started")
+            with open(state_path, "r") as f:
+                self.assertEqual(json.load(f)["stage"], "planning")
+
+            sm.update_many({"stage": "implementing", "iteration": 1})
+            with open(state_path, "r") as f:
+                self.assertEqual(json.load(f)["stage"], "planning")
+            sm.update_state("run_status", "stopped")
+            with open(state_path, "r") as f:
+                self.assertEqual(json.load(f), {"stage": "implementing", "iteration": 1, "run_status": "stopped"})
+            sm.flush_deferred()
+
+    def test_background_writer_persists_debounced_updates(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="luigi-state-") as tmp:
+            sm = StateManager(logs_root=tmp, run_id="run-1", flush_debounce_ms=20)
+            state_path = os.path.join(sm.log_dir, "state.json")
+            sm.update_state("stage", "planning")
+            sm.update_state("stage", "implementing")
+            deadline = time.monotonic() + 5.0
+            while not os.path.exists(state_path) and time.monotonic() < deadline:
+                time.sleep(0.01)
+            sm.update_state("iteration", 2)
+            sm.flush_deferred()
+            with open(state_path, "r") as f:
+                self.assertEqual(json.load(f), {"stage": "implementing", "iteration": 2})
+
+    def test_background_writer_survives_a_failed_save(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="luigi-state-") as tmp:
+            sm = StateManager(logs_root=tmp, run_id="run-1", flush_debounce_ms=20)
+            state_path = os.path.join(sm.log_dir, "state.json")
+            with mock.patch("sys.stderr", new_callable=io.StringIO) as stderr:
+                sm.update_state("candidates", object())
+                deadline = time.monotonic() + 5.0
+                while "State save failed" not in stderr.getvalue() and time.monotonic() < deadline:
+                    time.sleep(0.01)
+            self.assertIn("State save failed", stderr.getvalue())
+            sm.update_state("candidates", {"c1": "DONE"})
+            deadline = time.monotonic() + 5.0
+            while not os.path.exists(state_path) and time.monotonic() < deadline:
+                time.sleep(0.01)
+            with open(state_path, "r") as f:
+                self.assertEqual(json.load(f), {"candidates": {"c1": "DONE"}})
+
+    def test_history_is_appended_and_survives_reload(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="luigi-state-") as tmp:
+            sm = StateManager(logs_root=tmp, run_id="run-1")
+            sm.add_to_history("first")
+            sm.add_to_history("second")
+            resumed = StateManager(logs_root=tmp, run_id="run-1", load_existing=True)
+            resumed.add_to_history("third")
+            with open(os.path.join(sm.log_dir, "history.log"), "r") as f:
+                lines = f.read().split("\n")
+            self.assertEqual([line.split("] ", 1)[1] for line in lines], ["first", "second", "third"])
+
+    def test_unchanged_scalar_updates_skip_the_save(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="luigi-state-") as tmp:
+            sm = StateManager(logs_root=tmp, run_id="run-1")
+            saves = []
+            original_save = sm.save_state
+            sm.save_state = lambda: (saves.append(1), original_save())
+            qna = []
+            sm.update_state("stage", "planning")
+            sm.update_state("stage", "planning")
+            sm.update_many({"stage": "planning", "iteration": 1})
+            sm.update_state("user_qna", qna)
+            qna.append({"question": "q", "answer": "a"})
+            sm.update_state("user_qna", qna)
+            self.assertEqual(len(saves), 4)
+            with open(os.path.join(sm.log_dir, "state.json"), "r") as f:
+                self.assertEqual(json.load(f)["user_qna"], [{"question": "q", "answer": "a"}])
+
+    def test_user_qna_is_journaled_and_migrates_legacy_state(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="luigi-state-") as tmp:
+            sm = StateManager(logs_root=tmp, run_id="run-1")
+            sm.update_state("user_qna", [{"question": "old", "answer": "1"}])
+            self.assertEqual(sm.load_user_qna(), [{"question": "old", "answer": "1"}])
+
+            sm.add_user_qna([{"question": "q1", "answer": "a1"}])
+            sm.add_user_qna([{"question": "q2", "answer": "a2"}])
+            with open(os.path.join(sm.log_dir, "state.json"), "r") as f:
+                saved = json.load(f)
+            self.assertNotIn("user_qna", saved)
+            self.assertEqual(saved["user_qna_count"], 3)
+
+            # A torn final line from an interrupted append is ignored on reload.
+            with open(os.path.join(sm.log_dir, "user_qna.jsonl"), "a") as f:
+                f.write('{"question": "q3"')
+            reloaded = StateManager(logs_root=tmp, run_id="run-1", load_existing=True)
+            self.assertEqual(
+                [item["question"] for item in reloaded.load_user_qna()],
+                ["old", "q1", "q2"],
+            )
+            reloaded.add_user_qna([{"question": "q4", "answer": "a4"}])
+            self.assertEqual(
+                [item["question"] for item in reloaded.load_user_qna()],
+                ["old", "q1", "q2", "q4"],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import main
+from state_manager import StateManager
+
+
+class UserInputTest(unittest.TestCase):
+    def test_poll_for_response_prefers_matching_telegram_message(self) -> None:
+        class FakeTelegram:
+            def poll_updates(self, offset):
+                return {"result": [{"update_id": 3, "message": {"text": "other"}}, {"update_id": 4}]}
+
+            def filter_messages(self, updates):
+                return [{"text": "noise"}, {"text": "task: ship it"}]
+
+        with tempfile.TemporaryDirectory(prefix="luigi-poll-") as tmp:
+            state_manager = StateManager(logs_root=tmp, run_id="run-1")
+            source, result = main._poll_for_response(
+                os.path.join(state_manager.log_dir, "response.json"),
+                state_manager=state_manager,
+                telegram=FakeTelegram(),
+                match_telegram=lambda text: text[len("task: "):] if text.startswith("task: ") else None,
+                poll_interval_sec=0.01,
+                timeout_sec=1.0,
+                timeout_message="timed out",
+            )
+            self.assertEqual((source, result), ("telegram", "ship it"))
+            self.assertEqual(state_manager.get_state("telegram_update_offset"), 5)
+
+            with self.assertRaisesRegex(RuntimeError, "timed out"):
+                main._poll_for_response(
+                    os.path.join(state_manager.log_dir, "missing.json"),
+                    state_manager=state_manager,
+                    telegram=None,
+                    match_telegram=None,
+                    poll_interval_sec=0.01,
+                    timeout_sec=0.05,
+                    timeout_message="timed out",
+                )
+
+    def test_poll_for_response_wakes_on_ui_file_while_telegram_is_polled(self) -> None:
+        class SilentTelegram:
+            def poll_updates(self, offset):
+                time.sleep(0.05)
+                return {"ok": True, "result": []}
+
+            def filter_messages(self, updates):
+                return []
+
+        with tempfile.TemporaryDirectory(prefix="luigi-poll-") as tmp:
+            state_manager = StateManager(logs_root=tmp, run_id="run-1")
+            response_path = os.path.join(state_manager.log_dir, "response.json")
+
+            def _respond() -> None:
+                time.sleep(0.1)
+                # Same tmp-file + rename the UI uses.
+                with open(response_path + ".tmp", "w") as f:
+                    json.dump({"answer": "yes"}, f)
+                os.replace(response_path + ".tmp", response_path)
+
+            threading.Thread(target=_respond).start()
+            started = time.monotonic()
+            source, result = main._poll_for_response(
+                response_path,
+                state_manager=state_manager,
+                telegram=SilentTelegram(),
+                match_telegram=lambda text: text,
+                poll_interval_sec=5.0,
+                timeout_sec=10.0,
+                timeout_message="timed out",
+            )
+            self.assertEqual((source, result), ("ui", {"answer": "yes"}))
+            self.assertLess(time.monotonic() - started, 2.0)
+            self.assertFalse(os.path.exists(response_path))
+
+    def test_poll_for_response_drops_telegram_answer_after_ui_answer(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="luigi-poll-") as tmp:
+            state_manager = StateManager(logs_root=tmp, run_id="run-1")
+            response_path = os.path.join(state_manager.log_dir, "response.json")
+            polls_finished = []
+
+            class LateTelegram:
+                def poll_updates(self, offset):
+                    # The reply lands while a long poll is still in flight after the UI answered.
+                    while not os.path.exists(response_path) and not polls_finished:
+                        time.sleep(0.01)
+                    time.sleep(0.1)
+                    polls_finished.append(offset)
+                    return {"ok": True, "result": [{"update_id": 7}]}
+
+                def filter_messages(self, updates):
+                    return [{"text": "late answer"}] if updates.get("result") else []
+
+            with open(response_path, "w") as f:
+                json.dump({"answer": "yes"}, f)
+            source, result = main._poll_for_response(
+                response_path,
+                state_manager=state_manager,
+                telegram=LateTelegram(),
+                match_telegram=lambda text: text,
+                poll_interval_sec=0.01,
+                timeout_sec=5.0,
+                timeout_message="timed out",
+            )
+            self.assertEqual((source, result), ("ui", {"answer": "yes"}))
+            # The watcher was joined, and the Telegram reply was not acknowledged.
+            self.assertEqual(polls_finished, [None])
+            self.assertIsNone(state_manager.get_state("telegram_update_offset"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,9 @@
 import os
+import subprocess
 import tempfile
 import unittest
 
-from workspace_manager import WorkspaceManager
+from workspace_manager import WorkspaceManager, _head_lines, _is_git_repo_with_commit
 
 
 class WorkspaceCandidateTest(unittest.TestCase):
@@ -56,6 +57,51 @@ class WorkspaceCandidateTest(unittest.TestCase):
             with open(os.path.join(repo_path, "file.txt"), "r") as f:
                 self.assertEqual(f.read(), "updated")
 
+    def test_diff_preview_matches_head_of_full_diff(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="luigi-ws-") as tmp:
+            repo_path = os.path.join(tmp, "repo")
+            os.makedirs(repo_path, exist_ok=True)
+            with open(os.path.join(repo_path, "file.txt"), "w") as f:
+                f.write("".join(f"line {i}\n" for i in range(100)))
+
+            mgr = WorkspaceManager(os.path.join(tmp, "workspaces"))
+            ws = mgr.create_candidate(
+                repo_path=repo_path,
+                run_id="run-1",
+                iteration=1,
+                candidate_id="cand-1",
+                strategy="copy",
+                use_git_worktree=False,
+            )
+            with open(os.path.join(ws.path, "file.txt"), "w") as f:
+                f.write("".join(f"changed {i}\n" for i in range(100)))
+
+            full = ws.get_diff()
+            preview = ws.get_diff_preview(40)
+            self.assertEqual(preview, "\n".join(full.splitlines()[:40]))
+            self.assertEqual(len(preview.splitlines()), 40)
+
+            # Same token: cached diff (and preview) even though the files changed again.
+            self.assertEqual(ws.get_diff(cache_token=(1, 0)), full)
+            with open(os.path.join(ws.path, "file.txt"), "w") as f:
+                f.write("rewritten\n")
+            self.assertEqual(ws.get_diff(cache_token=(1, 0)), full)
+            self.assertEqual(ws.get_diff_preview(40, cache_token=(1, 0)), preview)
+            self.assertNotEqual(ws.get_diff(cache_token=(1, 1)), full)
+
+    def test_head_lines(self) -> None:
+        self.assertEqual(_head_lines("a\nb\nc\n", 2), "a\nb")
+        self.assertEqual(_head_lines("a\nb", 5), "a\nb")
+        self.assertEqual(_head_lines("a\nb", 0), "")
+
+    def test_is_git_repo_with_commit(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="luigi-ws-") as tmp:
+            self.assertFalse(_is_git_repo_with_commit(tmp))
+            subprocess.run(["git", "init", "-q"], cwd=tmp, check=True)
+            self.assertFalse(_is_git_repo_with_commit(tmp))
+            subprocess.run(["git", "commit", "-q", "--allow-empty", "-m", "init"], cwd=tmp, check=True)
+            self.assertTrue(_is_git_repo_with_commit(tmp))
+
     def test_apply_to_repo_refuses_destination_symlink(self) -> None:
         with tempfile.TemporaryDirectory(prefix="luigi-ws-") as tmp:
             outside_path = os.path.join(tmp, "outside.txt")
@@ -192,16 +192,13 @@ def _load_base_config(repo_path: str) -> Dict[str, Any]:
         if isinstance(payload, dict):
             return payload
 
-    default_yaml = os.path.join(_ROOT_DIR, "config.yaml")
-    default_json = os.path.join(_ROOT_DIR, "config.json")
-    if os.path.isfile(default_yaml):
-        payload = _read_yaml(default_yaml)
-        if isinstance(payload, dict):
-            return payload
-    if os.path.isfile(default_json):
-        payload = _read_json(default_json)
-        if isinstance(payload, dict):
-            return payload
+    # The readers return None for missing files, so no isfile() probe is needed first.
+    payload = _read_yaml(os.path.join(_ROOT_DIR, "config.yaml"))
+    if isinstance(payload, dict):
+        return payload
+    payload = _read_json(os.path.join(_ROOT_DIR, "config.json"))
+    if isinstance(payload, dict):
+        return payload
     return {}
 
 
@@ -4,7 +4,6 @@ import socket
 import subprocess
 import sys
 import time
-import webbrowser
 from dataclasses import dataclass
 from typing import Optional
 
@@ -136,6 +135,8 @@ def start_streamlit_ui(
 
     if open_browser:
         try:
+            import webbrowser
+
             webbrowser.open(url)
         except Exception:
             pass
@@ -3,8 +3,8 @@ import os
 import re
 import shutil
 import subprocess
-from dataclasses import dataclass
-from typing import List, Optional, Set
+from dataclasses import dataclass, field
+from typing import Hashable, List, Optional, Set, Tuple
 
 
 def _validate_dir_name(value: str, *, label: str) -> str:
@@ -103,6 +103,36 @@ def _safe_dest_path(dst_root: str, rel_path: str, *, allow_symlink_file: bool) -
 def _run(cmd: List[str], *, cwd: Optional[str] = None) -> subprocess.CompletedProcess:
     return subprocess.run(cmd, cwd=cwd, capture_output=True, text=True)
 
+
+def _run_head(cmd: List[str], *, cwd: Optional[str] = None, max_lines: int) -> str:
+    """Run `cmd` and return at most `max_lines` lines of stdout, stopping the process early."""
+    lines: List[str] = []
+    if max_lines <= 0:
+        return ""
+    with subprocess.Popen(
+        cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    ) as proc:
+        if proc.stdout:
+            for line in proc.stdout:
+                lines.append(line)
+                if len(lines) >= max_lines:
+                    proc.kill()
+                    break
+    return "".join(lines)
+
+
+def _head_lines(text: str, max_lines: int) -> str:
+    """Return the first `max_lines` lines of `text` without splitting the rest of it."""
+    if max_lines <= 0:
+        return ""
+    end = -1
+    for _ in range(max_lines):
+        end = text.find("\n", end + 1)
+        if end < 0:
+            return text
+    return text[:end]
+
+
 def _git_branch_exists(repo_path: str, branch_name: str) -> bool:
     # branch_name should be a ref name like "orchestrator/<...>"
     result = _run(["git", "show-ref", "--verify", "--quiet", f"refs/heads/{branch_name}"], cwd=repo_path)
@@ -160,6 +190,12 @@ def has_git_commit(path: str) -> bool:
     return result.returncode == 0
 
 
+def _is_git_repo_with_commit(path: str) -> bool:
+    """`is_git_repo(path) and has_git_commit(path)` with a single git call."""
+    result = _run(["git", "rev-parse", "--is-inside-work-tree", "--verify", "HEAD"], cwd=path)
+    return result.returncode == 0 and result.stdout.split("\n", 1)[0].strip() == "true"
+
+
 def _default_copy_ignore_patterns(extra: Optional[List[str]] = None) -> List[str]:
     patterns = [
         ".git",
@@ -188,26 +224,77 @@ class Workspace:
     run_dir: str
     baseline_path: Optional[str] = None
     branch_name: Optional[str] = None
+    # (diff command,) once resolved, and (cache_token, diff) of the last tokened get_diff().
+    _resolved_diff_command: Optional[Tuple[Optional[Tuple[List[str], Optional[str]]]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _diff_cache: Optional[Tuple[Hashable, str]] = field(default=None, init=False, repr=False, compare=False)
+    # Whether `path` is inside a git work tree; the workspace path does not change, so probe once.
+    _in_git_repo: Optional[bool] = field(default=None, init=False, repr=False, compare=False)
+
+    def _is_git_workspace(self) -> bool:
+        if self._in_git_repo is None:
+            self._in_git_repo = is_git_repo(self.path)
+        return self._in_git_repo
+
+    def _diff_command(self) -> Optional[Tuple[List[str], Optional[str]]]:
+        """Return the (command, cwd) pair that produces this workspace's diff, if any.
+
+        Resolving it costs a git probe, and the answer can't change for a workspace, so it is
+        only worked out once.
+        """
+        if self._resolved_diff_command is None:
+            self._resolved_diff_command = (self._resolve_diff_command(),)
+        return self._resolved_diff_command[0]
 
-    def get_diff(self) -> str:
-        """Return a unified diff of changes made in the workspace."""
+    def _resolve_diff_command(self) -> Optional[Tuple[List[str], Optional[str]]]:
         # Prefer git diff when possible.
-        if self.strategy in ("worktree", "in_place") and is_git_repo(self.path):
-            result = _run(["git", "diff"], cwd=self.path)
-            return (result.stdout or "").strip()
+        if self.strategy in ("worktree", "in_place") and self._is_git_workspace():
+            return ["git", "diff"], self.path
 
         # Snapshot-based diff (works without a git repo).
         if not self.baseline_path:
-            return ""
+            return None
 
         # Use git diff --no-index if git is available (best formatting).
         git_check = _run(["git", "--version"])
         if git_check.returncode == 0:
-            result = _run(["git", "diff", "--no-index", "--", self.baseline_path, self.path])
-            # git diff returns exit code 1 when there are diffs; that's not an error here.
-            return (result.stdout or "").strip()
+            return ["git", "diff", "--no-index", "--", self.baseline_path, self.path], None
 
-        return ""
+        return None
+
+    def get_diff(self, cache_token: Optional[Hashable] = None) -> str:
+        """Return a unified diff of changes made in the workspace.
+
+        With a `cache_token` (something that changes whenever the workspace may have been
+        edited, e.g. an implementation attempt id), repeated calls with the same token reuse the
+        previous diff instead of running git again.
+        """
+        if cache_token is not None and self._diff_cache is not None and self._diff_cache[0] == cache_token:
+            return self._diff_cache[1]
+        diff_cmd = self._diff_command()
+        if not diff_cmd:
+            return ""
+        cmd, cwd = diff_cmd
+        # git diff --no-index returns exit code 1 when there are diffs; that's not an error here.
+        result = _run(cmd, cwd=cwd)
+        diff = (result.stdout or "").strip()
+        if cache_token is not None:
+            self._diff_cache = (cache_token, diff)
+        return diff
+
+    def get_diff_preview(self, max_lines: int = 40, cache_token: Optional[Hashable] = None) -> str:
+        """Return the first `max_lines` lines of the diff without reading the full output.
+
+        If `cache_token` matches the last cached `get_diff`, the preview is cut from that diff.
+        """
+        if cache_token is not None and self._diff_cache is not None and self._diff_cache[0] == cache_token:
+            return _head_lines(self._diff_cache[1], max_lines).strip()
+        diff_cmd = self._diff_command()
+        if not diff_cmd:
+            return ""
+        cmd, cwd = diff_cmd
+        return _run_head(cmd, cwd=cwd, max_lines=max_lines).strip()
 
     def cleanup(self) -> None:
         """Clean up any temporary workspace artifacts created for this run.
@@ -273,7 +360,7 @@ class Workspace:
 
     def commit_changes(self, message: str) -> Optional[str]:
         """Commit changes in a git workspace, returning the new commit SHA if any."""
-        if not is_git_repo(self.path):
+        if not self._is_git_workspace():
             return None
 
         status = _run(["git", "status", "--porcelain"], cwd=self.path)
@@ -371,14 +458,16 @@ class WorkspaceManager:
         if os.path.commonpath([repo_path, self.base_dir]) == repo_path:
             ignore_patterns.append(os.path.relpath(self.base_dir, repo_path).split(os.sep)[0])
 
+        # One git probe answers both the "auto" choice and the worktree precondition.
+        repo_has_commits: Optional[bool] = None
         if strategy == "auto":
-            if use_git_worktree and is_git_repo(repo_path) and has_git_commit(repo_path):
-                strategy = "worktree"
-            else:
-                strategy = "copy"
+            repo_has_commits = bool(use_git_worktree) and _is_git_repo_with_commit(repo_path)
+            strategy = "worktree" if repo_has_commits else "copy"
 
         if strategy == "worktree":
-            if not is_git_repo(repo_path) or not has_git_commit(repo_path):
+            if repo_has_commits is None:
+                repo_has_commits = _is_git_repo_with_commit(repo_path)
+            if not repo_has_commits:
                 raise RuntimeError("Requested git worktree strategy but repo is not a git repo with commits.")
 
             worktree_path = os.path.join(run_dir, "worktree")
@@ -512,14 +601,16 @@ class WorkspaceManager:
         if os.path.commonpath([source_root, self.base_dir]) == source_root:
             ignore_patterns.append(os.path.relpath(self.base_dir, source_root).split(os.sep)[0])
 
+        # One git probe answers both the "auto" choice and the worktree precondition.
+        repo_has_commits: Optional[bool] = None
         if strategy == "auto":
-            if use_git_worktree and is_git_repo(repo_path) and has_git_commit(repo_path):
-                strategy = "worktree"
-            else:
-                strategy = "copy"
+            repo_has_commits = bool(use_git_worktree) and _is_git_repo_with_commit(repo_path)
+            strategy = "worktree" if repo_has_commits else "copy"
 
         if strategy == "worktree":
-            if not is_git_repo(repo_path) or not has_git_commit(repo_path):
+            if repo_has_commits is None:
+                repo_has_commits = _is_git_repo_with_commit(repo_path)
+            if not repo_has_commits:
                 raise RuntimeError("Requested git worktree strategy but repo is not a git repo with commits.")
             worktree_path = os.path.join(run_dir, "worktree")
             prefix = _sanitize_branch_prefix(branch_prefix)